@@ -0,0 +1,50 @@
+import hashlib
+import os
+import tempfile
+
+# 添付ファイルはSHA-256をキーにしてディスク上に1度だけ保存し、DBには参照とメタデータのみを持つ
+ATTACHMENT_DIR = os.environ.get('ATTENDANCE_ATTACHMENT_DIR', 'attachments')
+CHUNK_SIZE = 1024 * 1024
+
+def blob_path(sha256):
+    return os.path.join(ATTACHMENT_DIR, sha256[:2], sha256)
+
+def write_blob(stream):
+    os.makedirs(ATTACHMENT_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=ATTACHMENT_DIR, prefix='.upload-')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                tmp.write(chunk)
+                size += len(chunk)
+
+        sha256 = digest.hexdigest()
+        path = blob_path(sha256)
+        if os.path.exists(path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return sha256, size
+
+def read_blob(sha256):
+    with open(blob_path(sha256), 'rb') as f:
+        return f.read()
+
+def register_attachment(conn, sha256, size, created_at):
+    conn.execute('INSERT OR IGNORE INTO attachments (sha256, size, created_at) VALUES (?, ?, ?)', (sha256, size, created_at))
+    return conn.execute('SELECT id FROM attachments WHERE sha256 = ?', (sha256,)).fetchone()[0]
+
+def store_attachment(conn, stream, created_at):
+    sha256, size = write_blob(stream)
+    return register_attachment(conn, sha256, size, created_at)
@@ -0,0 +1,22 @@
+import threading
+
+# ユーザーごとの当日の勤怠状態（プロセス内で共有し、複数タブから同じ状態が見えるようにする）。
+# 状態は {'work_date', 'attendance_id', 'work_status', 'break_id'} の辞書で、
+# work_date（JSTの日付）が変わった時点で無効になる。
+_lock = threading.Lock()
+_states = {}
+
+def get_state(user_id, work_date):
+    with _lock:
+        state = _states.get(user_id)
+        if state is None or state['work_date'] != work_date:
+            return None
+        return dict(state)
+
+def put_state(user_id, state):
+    with _lock:
+        _states[user_id] = dict(state)
+
+def invalidate(user_id):
+    with _lock:
+        _states.pop(user_id, None)
@@ -0,0 +1,213 @@
+import streamlit as st
+from datetime import datetime, date, time, timezone, timedelta
+import sqlite3
+import hashlib
+import re
+from database import db_connection
+import attendance_cache
+import deletion
+from attachments import blob_path, read_blob, register_attachment, write_blob
+
+# 複数のページから使う共通処理（認証・勤怠状態・メッセージ・添付ファイル）。
+# pandas や matplotlib などの重いライブラリはここでは読み込まない。
+
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+JST = timezone(timedelta(hours=9))
+
+def get_jst_now():
+    return datetime.now(JST)
+
+def shift_row_values(start_dt, end_dt):
+    # シフトの日時はJSTのナイーブな日時として保存し、検索用に勤務日とエポック秒も併せて持つ
+    return (start_dt.isoformat(), end_dt.isoformat(), start_dt.date().isoformat(),
+            int(start_dt.replace(tzinfo=JST).timestamp()), int(end_dt.replace(tzinfo=JST).timestamp()))
+
+def add_message(user_id, content):
+    now = get_jst_now().isoformat()
+    with db_connection() as conn:
+        conn.execute('INSERT INTO messages (user_id, sender_id, content, created_at, message_type) VALUES (?, ?, ?, ?, ?)',
+                     (user_id, user_id, content, now, 'SYSTEM'))
+
+def add_attendance_log(user_id, kind, content):
+    # 出退勤ログは従業員の会社ごとに attendance_events に記録する
+    now = get_jst_now().isoformat()
+    with db_connection() as conn:
+        conn.execute('INSERT INTO attendance_events (company, user_id, kind, content, created_at) SELECT company, id, ?, ?, ? FROM users WHERE id = ? AND company IS NOT NULL',
+                     (kind, content, now, user_id))
+
+def save_uploaded_file(uploaded_file):
+    if uploaded_file is None:
+        return None
+    uploaded_file.seek(0)
+    sha256, size = write_blob(uploaded_file)
+    with db_connection() as conn:
+        return register_attachment(conn, sha256, size, get_jst_now().isoformat())
+
+def render_attachment(sha256, file_name, file_type, label):
+    if file_type and file_type.startswith("image/"):
+        st.image(blob_path(sha256))
+    else:
+        st.download_button(label=label, data=read_blob(sha256), file_name=file_name, mime=file_type)
+
+def render_lazy_attachment(attachment_key, sha256, file_name, file_type, label):
+    # 添付ファイルの本体は利用者が開いた時に初めて読み込む（開いたものはセッション中は開いたまま）
+    if attachment_key in st.session_state.opened_attachments:
+        render_attachment(sha256, file_name, file_type, label)
+    elif st.button(f"📎 {file_name} を開く", key=f"open_attachment_{attachment_key}"):
+        st.session_state.opened_attachments.add(attachment_key)
+        st.rerun()
+
+def get_unread_counts(user_id):
+    # unread_counters はトリガーで維持されているので、ユーザーの行を主キーで引くだけで済む
+    with db_connection() as conn:
+        rows = conn.execute("""
+            SELECT c.channel, c.sender_id, c.unread_count, u.name
+            FROM unread_counters c LEFT JOIN users u ON u.id = c.sender_id
+            WHERE c.user_id = ? AND c.unread_count > 0
+        """, (user_id,)).fetchall()
+
+    broadcast_unread_count, dm_unread_count, unread_dm_senders = 0, 0, []
+    for row in rows:
+        if row['channel'] == 'DIRECT':
+            dm_unread_count += row['unread_count']
+            if row['name'] is not None:
+                unread_dm_senders.append({"id": row['sender_id'], "name": row['name'], "unread_count": row['unread_count']})
+        else:
+            broadcast_unread_count += row['unread_count']
+    return broadcast_unread_count, dm_unread_count, unread_dm_senders
+
+def validate_password(password):
+    errors = []
+    if len(password) < 8:
+        errors.append("・8文字以上である必要があります。")
+    if not re.search(r"[a-z]", password):
+        errors.append("・小文字を1文字以上含める必要があります。")
+    if not re.search(r"[A-Z]", password):
+        errors.append("・大文字を1文字以上含める必要があります。")
+    if not re.search(r"[0-9]", password):
+        errors.append("・数字を1文字以上含める必要があります。")
+    return errors
+
+def init_session_state():
+    defaults = {
+        'logged_in': False,
+        'user_id': None,
+        'user_name': None,
+        'user_company': None,
+        'user_position': None,
+        'work_status': "not_started",
+        'attendance_id': None,
+        'break_id': None,
+        'confirmation_action': None,
+        'page': "タイムカード",
+        'last_break_reminder_date': None,
+        'last_clock_out_reminder_date': None,
+        'calendar_date': date.today(),
+        'clicked_date_str': None,
+        'last_shift_start_time': time(9, 0),
+        'last_shift_end_time': time(17, 0),
+        'confirming_delete_broadcast_id': None,
+        'clock_in_error': None,
+        'confirming_delete_user_id': None,
+        'dm_selected_user_id': None,
+        'editing_date': None,
+        'show_broadcast_dialog': False,
+        'viewing_attendance_log': False, 
+        'daily_tip': None,
+        'confirm_delete_self_step': 0,
+        'confirm_delete_company_step': 0,
+        'password_error': None,
+        'timecard_snapshot': None,
+        'shift_table_page': 1,
+        'message_feed_cursor': None,
+        'opened_attachments': set(),
+        'dm_window': None,
+        'attendance_log_cursor': None,
+        'deletion_job_id': None,
+        'shift_import_plan': None,
+    }
+    for key, default_value in defaults.items():
+        if key not in st.session_state:
+            st.session_state[key] = default_value
+
+def get_user(employee_id):
+    with db_connection() as conn:
+        return conn.execute('SELECT * FROM users WHERE employee_id = ?', (employee_id,)).fetchone()
+
+def register_user(name, employee_id, password, company, position):
+    hashed_password = hash_password(password)
+    now = get_jst_now().isoformat()
+    try:
+        with db_connection() as conn:
+            conn.execute('INSERT INTO users (name, employee_id, password_hash, created_at, company, position) VALUES (?, ?, ?, ?, ?, ?)',
+                         (name, employee_id, hashed_password, now, company, position))
+        return True
+    except sqlite3.IntegrityError:
+        return False
+
+def delete_user(user_id_to_delete):
+    # 関連データを依存関係の順にチャンク単位で削除する（途中で止まっても次回起動時に再開される）
+    try:
+        return deletion.run_job(deletion.create_job('user', user_id_to_delete))
+    except sqlite3.Error as e:
+        print(f"ユーザー削除中にエラーが発生しました: {e}")
+        return False
+
+def load_attendance_state(user_id, work_date):
+    state = {'work_date': work_date, 'attendance_id': None, 'work_status': "not_started", 'break_id': None}
+    with db_connection() as conn:
+        att = conn.execute('SELECT * FROM attendance WHERE user_id = ? AND work_date = ?', (user_id, work_date)).fetchone()
+        if att:
+            state['attendance_id'] = att['id']
+            if att['clock_out']:
+                state['work_status'] = "finished"
+            elif att['clock_in']:
+                last_break = conn.execute('SELECT * FROM breaks WHERE attendance_id = ? ORDER BY id DESC LIMIT 1', (att['id'],)).fetchone()
+                if last_break and last_break['break_end'] is None:
+                    state['work_status'] = "on_break"
+                    state['break_id'] = last_break['id']
+                else:
+                    state['work_status'] = "working"
+    return state
+
+def apply_attendance_state(state):
+    st.session_state.attendance_id = state['attendance_id']
+    st.session_state.work_status = state['work_status']
+    st.session_state.break_id = state['break_id']
+
+def set_attendance_state(attendance_id, work_status, break_id=None):
+    # 打刻処理は新しい状態を確定しているので、DBを読み直さずにキャッシュへ書き込む
+    state = {'work_date': get_jst_now().date().isoformat(), 'attendance_id': attendance_id, 'work_status': work_status, 'break_id': break_id}
+    attendance_cache.put_state(st.session_state.user_id, state)
+    apply_attendance_state(state)
+    invalidate_timecard_snapshot()
+
+def get_today_attendance_status(user_id):
+    today_str = get_jst_now().date().isoformat()
+    state = attendance_cache.get_state(user_id, today_str)
+    if state is None:
+        state = load_attendance_state(user_id, today_str)
+        attendance_cache.put_state(user_id, state)
+    apply_attendance_state(state)
+
+def get_user_employee_id(user_id):
+    with db_connection() as conn:
+        employee_id_row = conn.execute('SELECT employee_id FROM users WHERE id = ?', (user_id,)).fetchone()
+    return employee_id_row['employee_id'] if employee_id_row else "N/A"
+
+def get_shift_data_version(company_name):
+    # シフトや従業員が変わるたびにトリガーで増える会社単位のバージョン（シフト関連のキャッシュキーに使う）
+    with db_connection() as conn:
+        version_row = conn.execute("SELECT version FROM shift_table_versions WHERE company = ?", (company_name,)).fetchone()
+    return version_row['version'] if version_row else 0
+
+def get_user_shift_version(user_id):
+    # その従業員のシフトが変わるたびにトリガーで増える従業員単位のバージョン
+    with db_connection() as conn:
+        version_row = conn.execute("SELECT version FROM shift_user_versions WHERE user_id = ?", (user_id,)).fetchone()
+    return version_row['version'] if version_row else 0
+
+def invalidate_timecard_snapshot():
+    st.session_state.timecard_snapshot = None
@@ -1,54 +1,158 @@
+import base64
+import io
+import os
+import queue
 import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+
+import attachments
+import work_summary
 
 DATABASE_NAME = 'attendance.db'
+JST_OFFSET_SECONDS = 9 * 3600
+
+# 接続プールの設定（環境変数で上書き可能）
+POOL_SIZE = int(os.environ.get('ATTENDANCE_DB_POOL_SIZE', 8))
+POOL_TIMEOUT_SECONDS = float(os.environ.get('ATTENDANCE_DB_POOL_TIMEOUT', 30))
+BUSY_TIMEOUT_MS = int(os.environ.get('ATTENDANCE_DB_BUSY_TIMEOUT_MS', 5000))
+CACHE_SIZE_KIB = int(os.environ.get('ATTENDANCE_DB_CACHE_SIZE_KIB', 16384))
+MMAP_SIZE = int(os.environ.get('ATTENDANCE_DB_MMAP_SIZE', 256 * 1024 * 1024))
+# 1 にすると、実行された全クエリの実行計画を検査し、テーブル全走査があれば例外にする（開発・CI用）
+CHECK_QUERY_PLANS = os.environ.get('ATTENDANCE_DB_CHECK_PLANS') == '1'
 
-def get_db_connection():
-    conn = sqlite3.connect(DATABASE_NAME)
+class FullTableScanError(sqlite3.DatabaseError):
+    pass
+
+def _open_connection(path):
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KIB}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    conn.execute("PRAGMA temp_store=MEMORY")
     return conn
 
-def update_db_schema():
-    conn = get_db_connection()
-    cursor = conn.cursor()
+def find_full_scans(conn, sql, params=()):
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return [row[-1] for row in plan if row[-1].startswith('SCAN ') and row[-1] != 'SCAN CONSTANT ROW']
 
-    cursor.execute("PRAGMA table_info(users)")
-    user_columns = [row['name'] for row in cursor.fetchall()]
-    
-    if 'company' not in user_columns:
-        cursor.execute("ALTER TABLE users ADD COLUMN company TEXT")
-    if 'position' not in user_columns:
-        cursor.execute("ALTER TABLE users ADD COLUMN position TEXT")
+def _check_query_plans(conn, statements):
+    violations = []
+    for sql in dict.fromkeys(statements):
+        keyword = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+        if keyword not in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE'):
+            continue
+        for detail in find_full_scans(conn, sql):
+            violations.append(f"{detail}: {' '.join(sql.split())}")
+    if violations:
+        raise FullTableScanError("テーブル全走査が発生しました:\n" + "\n".join(violations))
 
-    cursor.execute("PRAGMA table_info(shifts)")
-    shift_columns = [row['name'] for row in cursor.fetchall()]
-    if 'work_date' not in shift_columns:
-        cursor.execute("ALTER TABLE shifts ADD COLUMN work_date TEXT")
+# DBファイルごとの接続プール。
+# 同じスレッド内で入れ子に取得した場合は同じ接続を返し、
+# 一番外側のブロックを抜けた時点でコミット（例外時はロールバック）してプールへ戻す。
+class ConnectionPool:
+    def __init__(self, path, size=POOL_SIZE, timeout=POOL_TIMEOUT_SECONDS):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._local = threading.local()
+        self._all = []
+        self._all_lock = threading.Lock()
 
-    cursor.execute("PRAGMA table_info(messages)")
-    message_columns = [row['name'] for row in cursor.fetchall()]
+    def _acquire(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise sqlite3.OperationalError(f"接続プールが枯渇しました（最大{self.size}接続）")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            conn = _open_connection(self.path)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._all_lock:
+            self._all.append(conn)
+        return conn
 
-    new_message_columns = {
-        "sender_id": "INTEGER",
-        "file_base64": "TEXT",
-        "file_name": "TEXT",
-        "file_type": "TEXT",
-        "message_type": "TEXT DEFAULT 'SYSTEM'"
-    }
+    def _release(self, conn):
+        conn.row_factory = sqlite3.Row
+        self._idle.put(conn)
+        self._slots.release()
 
-    for col_name, col_type in new_message_columns.items():
-        if col_name not in message_columns:
-            cursor.execute(f"ALTER TABLE messages ADD COLUMN {col_name} {col_type}")
-            print(f"Added '{col_name}' column to 'messages' table.")
+    @contextmanager
+    def connection(self, check_plans=CHECK_QUERY_PLANS):
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is not None:
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
 
-    conn.commit()
-    conn.close()
+        conn = self._acquire()
+        local.conn, local.depth = conn, 1
+        statements = []
+        if check_plans:
+            conn.set_trace_callback(statements.append)
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+            if check_plans:
+                conn.set_trace_callback(None)
+                _check_query_plans(conn, statements)
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            if check_plans:
+                conn.set_trace_callback(None)
+            local.conn = None
+            self._release(conn)
 
+    def close_all(self):
+        with self._all_lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            conn.close()
+        self._idle = queue.LifoQueue()
 
-def init_db():
-    conn = get_db_connection()
-    cursor = conn.cursor()
+_pools = {}
+_pools_lock = threading.Lock()
 
-    cursor.execute('''
+def get_pool(path=None):
+    path = path or DATABASE_NAME
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.setdefault(path, ConnectionPool(path))
+    return pool
+
+def db_connection(path=None, check_plans=CHECK_QUERY_PLANS):
+    return get_pool(path).connection(check_plans=check_plans)
+
+def close_all_connections():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+def _column_names(conn, table):
+    return [row['name'] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+def _migrate_base_schema(conn):
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT NOT NULL,
@@ -60,7 +164,7 @@ def init_db():
         )
     ''')
 
-    cursor.execute('''
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS attendance (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
@@ -71,7 +175,7 @@ def init_db():
         )
     ''')
 
-    cursor.execute('''
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS breaks (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             attendance_id INTEGER NOT NULL,
@@ -81,7 +185,7 @@ def init_db():
         )
     ''')
 
-    cursor.execute('''
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS shifts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
@@ -92,7 +196,7 @@ def init_db():
         )
     ''')
 
-    cursor.execute('''
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS messages (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
@@ -109,7 +213,7 @@ def init_db():
         )
     ''')
 
-    cursor.execute('''
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS pinned_users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
@@ -120,12 +224,524 @@ def init_db():
         )
     ''')
 
-    conn.commit()
-    conn.close()
-    
-    update_db_schema()
+    # 旧バージョンのDBで後から追加されたカラム
+    user_columns = _column_names(conn, 'users')
+    if 'company' not in user_columns:
+        conn.execute("ALTER TABLE users ADD COLUMN company TEXT")
+    if 'position' not in user_columns:
+        conn.execute("ALTER TABLE users ADD COLUMN position TEXT")
+
+    if 'work_date' not in _column_names(conn, 'shifts'):
+        conn.execute("ALTER TABLE shifts ADD COLUMN work_date TEXT")
+
+    message_columns = _column_names(conn, 'messages')
+    new_message_columns = {
+        "sender_id": "INTEGER",
+        "file_base64": "TEXT",
+        "file_name": "TEXT",
+        "file_type": "TEXT",
+        "message_type": "TEXT DEFAULT 'SYSTEM'"
+    }
+    for col_name, col_type in new_message_columns.items():
+        if col_name not in message_columns:
+            conn.execute(f"ALTER TABLE messages ADD COLUMN {col_name} {col_type}")
+            print(f"Added '{col_name}' column to 'messages' table.")
+
+def _migrate_hot_path_indexes(conn):
+    # 一意インデックスを張る前に、同一ユーザー・同一日の重複した勤怠記録を最小IDの行へ統合する
+    duplicates = conn.execute('''
+        SELECT user_id, work_date, MIN(id) AS keep_id, MIN(clock_in) AS clock_in, MAX(clock_out) AS clock_out
+        FROM attendance GROUP BY user_id, work_date HAVING COUNT(*) > 1
+    ''').fetchall()
+    for dup in duplicates:
+        conn.execute('UPDATE breaks SET attendance_id = ? WHERE attendance_id IN (SELECT id FROM attendance WHERE user_id = ? AND work_date = ?)',
+                     (dup['keep_id'], dup['user_id'], dup['work_date']))
+        conn.execute('UPDATE attendance SET clock_in = ?, clock_out = ? WHERE id = ?', (dup['clock_in'], dup['clock_out'], dup['keep_id']))
+        conn.execute('DELETE FROM attendance WHERE user_id = ? AND work_date = ? AND id != ?', (dup['user_id'], dup['work_date'], dup['keep_id']))
+
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_user_date ON attendance (user_id, work_date)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_breaks_attendance ON breaks (attendance_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_shifts_user_start ON shifts (user_id, start_datetime)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_users_company ON users (company)")
+    # 未読件数・未読送信者（main と宛先リスト）
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_unread ON messages (user_id, is_read, message_type, sender_id)")
+    # 全体メッセージ一覧（受信者ごとに新しい順）
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_feed ON messages (user_id, message_type, created_at)")
+    # DM履歴（送信者・受信者の組ごとに時系列）
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_dm ON messages (sender_id, user_id, created_at)")
+    # 出退勤ログ・一斉送信の削除
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_type_created ON messages (message_type, created_at)")
+
+def _migrate_shift_date_columns(conn):
+    shift_columns = _column_names(conn, 'shifts')
+    if 'start_epoch' not in shift_columns:
+        conn.execute("ALTER TABLE shifts ADD COLUMN start_epoch INTEGER")
+    if 'end_epoch' not in shift_columns:
+        conn.execute("ALTER TABLE shifts ADD COLUMN end_epoch INTEGER")
+
+    # シフト日時はJSTのナイーブな文字列なので、UTCとして解釈した値から9時間を引いてエポック秒にする
+    conn.execute(f'''
+        UPDATE shifts SET
+            work_date = date(start_datetime),
+            start_epoch = CAST(strftime('%s', start_datetime) AS INTEGER) - {JST_OFFSET_SECONDS},
+            end_epoch = CAST(strftime('%s', end_datetime) AS INTEGER) - {JST_OFFSET_SECONDS}
+        WHERE work_date IS NULL OR start_epoch IS NULL OR end_epoch IS NULL
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_shifts_user_date ON shifts (user_id, work_date)")
+    conn.execute("DROP INDEX IF EXISTS idx_shifts_user_start")
+
+def _migrate_attachment_store(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS attachments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sha256 TEXT UNIQUE NOT NULL,
+            size INTEGER NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    ''')
+    if 'attachment_id' not in _column_names(conn, 'messages'):
+        conn.execute("ALTER TABLE messages ADD COLUMN attachment_id INTEGER REFERENCES attachments (id)")
+
+    # 既存のBase64添付をブロブストアへ移し、メッセージ行からは本体を取り除く（同一内容は1ファイルに集約される）
+    last_id = 0
+    while True:
+        rows = conn.execute('SELECT id, created_at, file_base64 FROM messages WHERE id > ? AND file_base64 IS NOT NULL ORDER BY id LIMIT 100',
+                            (last_id,)).fetchall()
+        if not rows:
+            break
+        for row in rows:
+            attachment_id = None
+            if row['file_base64']:
+                payload = io.BytesIO(base64.b64decode(row['file_base64']))
+                attachment_id = attachments.store_attachment(conn, payload, row['created_at'])
+            conn.execute('UPDATE messages SET attachment_id = ?, file_base64 = NULL WHERE id = ?', (attachment_id, row['id']))
+        last_id = rows[-1]['id']
+
+def _migrate_broadcasts(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            company TEXT,
+            sender_id INTEGER,
+            content TEXT,
+            created_at TEXT NOT NULL,
+            attachment_id INTEGER,
+            file_name TEXT,
+            file_type TEXT,
+            FOREIGN KEY (sender_id) REFERENCES users (id),
+            FOREIGN KEY (attachment_id) REFERENCES attachments (id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS broadcast_reads (
+            broadcast_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            read_at TEXT NOT NULL,
+            PRIMARY KEY (broadcast_id, user_id),
+            FOREIGN KEY (broadcast_id) REFERENCES broadcasts (id),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_broadcasts_company_created ON broadcasts (company, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_broadcast_reads_user ON broadcast_reads (user_id)")
+
+    # 従業員ごとに複製されていた一斉送信を (送信者, 送信日時) 単位で1行にまとめ、既読状態を受信記録へ移す
+    conn.execute('''
+        INSERT INTO broadcasts (company, sender_id, content, created_at, attachment_id, file_name, file_type)
+        SELECT COALESCE(s.company, r.company), m.sender_id, m.content, m.created_at, m.attachment_id, m.file_name, m.file_type
+        FROM messages m LEFT JOIN users s ON s.id = m.sender_id LEFT JOIN users r ON r.id = m.user_id
+        WHERE m.message_type = 'BROADCAST'
+        GROUP BY m.sender_id, m.created_at
+        ORDER BY MIN(m.id)
+    ''')
+    conn.execute('''
+        INSERT OR IGNORE INTO broadcast_reads (broadcast_id, user_id, read_at)
+        SELECT b.id, m.user_id, m.created_at
+        FROM messages m JOIN broadcasts b ON b.sender_id IS m.sender_id AND b.created_at = m.created_at
+        WHERE m.message_type = 'BROADCAST' AND m.is_read = 1
+    ''')
+    conn.execute("DELETE FROM messages WHERE message_type = 'BROADCAST'")
+
+def _migrate_unread_counters(conn):
+    # 未読件数をユーザー・チャネル・DM送信者ごとに保持し、トリガーで書き込み時に更新する。
+    # channel は 'SYSTEM' / 'BROADCAST' / 'DIRECT'。DM以外の sender_id は 0。
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS unread_counters (
+            user_id INTEGER NOT NULL,
+            channel TEXT NOT NULL,
+            sender_id INTEGER NOT NULL DEFAULT 0,
+            unread_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, channel, sender_id)
+        ) WITHOUT ROWID
+    ''')
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_messages_unread_insert
+        AFTER INSERT ON messages
+        WHEN COALESCE(NEW.is_read, 0) = 0 AND NEW.message_type IN ('SYSTEM', 'DIRECT')
+        BEGIN
+            INSERT INTO unread_counters (user_id, channel, sender_id, unread_count)
+            VALUES (NEW.user_id, NEW.message_type, CASE WHEN NEW.message_type = 'DIRECT' THEN COALESCE(NEW.sender_id, 0) ELSE 0 END, 1)
+            ON CONFLICT (user_id, channel, sender_id) DO UPDATE SET unread_count = unread_count + 1;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_messages_unread_read
+        AFTER UPDATE OF is_read ON messages
+        WHEN COALESCE(OLD.is_read, 0) = 0 AND NEW.is_read = 1 AND NEW.message_type IN ('SYSTEM', 'DIRECT')
+        BEGIN
+            UPDATE unread_counters SET unread_count = MAX(unread_count - 1, 0)
+            WHERE user_id = NEW.user_id AND channel = NEW.message_type
+              AND sender_id = CASE WHEN NEW.message_type = 'DIRECT' THEN COALESCE(NEW.sender_id, 0) ELSE 0 END;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_messages_unread_delete
+        AFTER DELETE ON messages
+        WHEN COALESCE(OLD.is_read, 0) = 0 AND OLD.message_type IN ('SYSTEM', 'DIRECT')
+        BEGIN
+            UPDATE unread_counters SET unread_count = MAX(unread_count - 1, 0)
+            WHERE user_id = OLD.user_id AND channel = OLD.message_type
+              AND sender_id = CASE WHEN OLD.message_type = 'DIRECT' THEN COALESCE(OLD.sender_id, 0) ELSE 0 END;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_broadcasts_unread_insert
+        AFTER INSERT ON broadcasts
+        BEGIN
+            INSERT INTO unread_counters (user_id, channel, sender_id, unread_count)
+            SELECT id, 'BROADCAST', 0, 1 FROM users WHERE company = NEW.company AND created_at <= NEW.created_at
+            ON CONFLICT (user_id, channel, sender_id) DO UPDATE SET unread_count = unread_count + 1;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_broadcast_reads_insert
+        AFTER INSERT ON broadcast_reads
+        BEGIN
+            UPDATE unread_counters SET unread_count = MAX(unread_count - 1, 0)
+            WHERE user_id = NEW.user_id AND channel = 'BROADCAST' AND sender_id = 0;
+        END
+    ''')
+    # 一斉送信の削除時は、未読のまま残っていた受信者の件数を戻してから既読記録も削除する
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_broadcasts_delete
+        AFTER DELETE ON broadcasts
+        BEGIN
+            UPDATE unread_counters SET unread_count = MAX(unread_count - 1, 0)
+            WHERE channel = 'BROADCAST' AND sender_id = 0 AND user_id IN (
+                SELECT u.id FROM users u
+                WHERE u.company = OLD.company AND u.created_at <= OLD.created_at
+                  AND NOT EXISTS (SELECT 1 FROM broadcast_reads r WHERE r.broadcast_id = OLD.id AND r.user_id = u.id)
+            );
+            DELETE FROM broadcast_reads WHERE broadcast_id = OLD.id;
+        END
+    ''')
+
+    conn.execute("DELETE FROM unread_counters")
+    conn.execute('''
+        INSERT INTO unread_counters (user_id, channel, sender_id, unread_count)
+        SELECT user_id, message_type, CASE WHEN message_type = 'DIRECT' THEN COALESCE(sender_id, 0) ELSE 0 END AS sender_key, COUNT(*)
+        FROM messages WHERE is_read = 0 AND message_type IN ('SYSTEM', 'DIRECT')
+        GROUP BY user_id, message_type, sender_key
+    ''')
+    conn.execute('''
+        INSERT INTO unread_counters (user_id, channel, sender_id, unread_count)
+        SELECT u.id, 'BROADCAST', 0, COUNT(*)
+        FROM users u JOIN broadcasts b ON b.company = u.company AND b.created_at >= u.created_at
+        WHERE NOT EXISTS (SELECT 1 FROM broadcast_reads r WHERE r.broadcast_id = b.id AND r.user_id = u.id)
+        GROUP BY u.id
+    ''')
+
+def _migrate_daily_work_summary(conn):
+    # 勤怠の日次集計。打刻・休憩・シフトの書き込み時に work_summary.refresh_day で該当日だけ更新する。
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS daily_work_summary (
+            user_id INTEGER NOT NULL,
+            work_date TEXT NOT NULL,
+            gross_seconds REAL NOT NULL DEFAULT 0,
+            net_seconds REAL NOT NULL DEFAULT 0,
+            break_seconds REAL NOT NULL DEFAULT 0,
+            overtime_seconds REAL NOT NULL DEFAULT 0,
+            night_seconds REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, work_date)
+        ) WITHOUT ROWID
+    ''')
+    work_summary.rebuild(conn)
+
+def _migrate_shift_table_versions(conn):
+    # 会社ごとのシフト表のデータバージョン。シフトや従業員の追加・変更・削除でトリガーが1ずつ増やし、
+    # 月間シフト表のキャッシュキーに使う。
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS shift_table_versions (
+            company TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+    for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_shifts_version_{event.lower()}
+            AFTER {event} ON shifts
+            BEGIN
+                INSERT INTO shift_table_versions (company, version)
+                SELECT company, 1 FROM users WHERE id = {row}.user_id AND company IS NOT NULL
+                ON CONFLICT (company) DO UPDATE SET version = version + 1;
+            END
+        ''')
+    # 会社を移った従業員は移動元・移動先の両方のシフト表に影響する
+    for name, event, row in (('insert', 'INSERT', 'NEW'), ('update', 'UPDATE OF name, position, company', 'NEW'),
+                             ('move', 'UPDATE OF company', 'OLD'), ('delete', 'DELETE', 'OLD')):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_users_shift_version_{name}
+            AFTER {event} ON users
+            WHEN {row}.company IS NOT NULL
+            BEGIN
+                INSERT INTO shift_table_versions (company, version) VALUES ({row}.company, 1)
+                ON CONFLICT (company) DO UPDATE SET version = version + 1;
+            END
+        ''')
+
+def _migrate_dm_conversations(conn):
+    # DMの相手ごとの要約。ユーザーの組は順序なしで (小さいID, 大きいID) に正規化し、
+    # unread_low / unread_high はそれぞれ user_low / user_high 側の未読件数。メッセージへのトリガーで更新する。
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS dm_conversations (
+            user_low INTEGER NOT NULL,
+            user_high INTEGER NOT NULL,
+            last_message_at TEXT,
+            last_message_id INTEGER,
+            unread_low INTEGER NOT NULL DEFAULT 0,
+            unread_high INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_low, user_high)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dm_conversations_high ON dm_conversations (user_high, user_low)")
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_messages_dm_insert
+        AFTER INSERT ON messages
+        WHEN NEW.message_type = 'DIRECT'
+        BEGIN
+            INSERT INTO dm_conversations (user_low, user_high, last_message_at, last_message_id, unread_low, unread_high)
+            VALUES (MIN(NEW.user_id, NEW.sender_id), MAX(NEW.user_id, NEW.sender_id), NEW.created_at, NEW.id,
+                    COALESCE(NEW.is_read, 0) = 0 AND NEW.user_id < NEW.sender_id,
+                    COALESCE(NEW.is_read, 0) = 0 AND NEW.user_id > NEW.sender_id)
+            ON CONFLICT (user_low, user_high) DO UPDATE SET
+                last_message_at = excluded.last_message_at,
+                last_message_id = excluded.last_message_id,
+                unread_low = unread_low + excluded.unread_low,
+                unread_high = unread_high + excluded.unread_high;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_messages_dm_read
+        AFTER UPDATE OF is_read ON messages
+        WHEN NEW.message_type = 'DIRECT' AND COALESCE(OLD.is_read, 0) = 0 AND NEW.is_read = 1
+        BEGIN
+            UPDATE dm_conversations SET
+                unread_low = MAX(unread_low - (NEW.user_id < NEW.sender_id), 0),
+                unread_high = MAX(unread_high - (NEW.user_id > NEW.sender_id), 0)
+            WHERE user_low = MIN(NEW.user_id, NEW.sender_id) AND user_high = MAX(NEW.user_id, NEW.sender_id);
+        END
+    ''')
+    # 最新のメッセージが削除された場合は、残っている中で最新のものを探し直す（無くなれば行ごと削除する）
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_messages_dm_delete
+        AFTER DELETE ON messages
+        WHEN OLD.message_type = 'DIRECT'
+        BEGIN
+            UPDATE dm_conversations SET
+                unread_low = MAX(unread_low - (COALESCE(OLD.is_read, 0) = 0 AND OLD.user_id < OLD.sender_id), 0),
+                unread_high = MAX(unread_high - (COALESCE(OLD.is_read, 0) = 0 AND OLD.user_id > OLD.sender_id), 0)
+            WHERE user_low = MIN(OLD.user_id, OLD.sender_id) AND user_high = MAX(OLD.user_id, OLD.sender_id);
+            UPDATE dm_conversations SET (last_message_at, last_message_id) = (
+                SELECT m.created_at, m.id FROM messages m
+                WHERE m.message_type = 'DIRECT'
+                  AND ((m.user_id = OLD.user_id AND m.sender_id = OLD.sender_id) OR (m.user_id = OLD.sender_id AND m.sender_id = OLD.user_id))
+                ORDER BY m.created_at DESC, m.id DESC LIMIT 1
+            )
+            WHERE user_low = MIN(OLD.user_id, OLD.sender_id) AND user_high = MAX(OLD.user_id, OLD.sender_id) AND last_message_id = OLD.id;
+            DELETE FROM dm_conversations
+            WHERE user_low = MIN(OLD.user_id, OLD.sender_id) AND user_high = MAX(OLD.user_id, OLD.sender_id) AND last_message_id IS NULL;
+        END
+    ''')
+
+    # 既存のDMから作成する。MAX(created_at) と同じ行の id を取るため SQLite の集約時の列の扱いを利用する
+    conn.execute("DELETE FROM dm_conversations")
+    conn.execute('''
+        INSERT INTO dm_conversations (user_low, user_high, last_message_at, last_message_id, unread_low, unread_high)
+        SELECT MIN(user_id, sender_id) AS low, MAX(user_id, sender_id) AS high, MAX(created_at), id,
+               TOTAL(COALESCE(is_read, 0) = 0 AND user_id < sender_id), TOTAL(COALESCE(is_read, 0) = 0 AND user_id > sender_id)
+        FROM messages
+        WHERE message_type = 'DIRECT' AND user_id IS NOT NULL AND sender_id IS NOT NULL
+        GROUP BY low, high
+    ''')
+
+def _migrate_attendance_events(conn):
+    # 出退勤ログを会社ごとの attendance_events に分ける（従来は messages に user_id = 0 / 'ATTENDANCE' で保存していた）。
+    # kind は 'clock_in' / 'clock_out' / 'clock_out_reminder'。
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS attendance_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            company TEXT NOT NULL,
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            content TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attendance_events_company_created ON attendance_events (company, created_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_attendance_events_user ON attendance_events (user_id)")
+
+    # 種別は本文の先頭の絵文字から判定する。削除済みの従業員のログは会社が分からないため移さない
+    conn.execute('''
+        INSERT INTO attendance_events (company, user_id, kind, content, created_at)
+        SELECT u.company, m.sender_id,
+               CASE WHEN m.content LIKE '✅%' THEN 'clock_in'
+                    WHEN m.content LIKE '🌙%' THEN 'clock_out'
+                    ELSE 'clock_out_reminder' END,
+               m.content, m.created_at
+        FROM messages m JOIN users u ON u.id = m.sender_id
+        WHERE m.message_type = 'ATTENDANCE' AND u.company IS NOT NULL
+        ORDER BY m.created_at, m.id
+    ''')
+    conn.execute("DELETE FROM messages WHERE message_type = 'ATTENDANCE'")
+    # この索引は出退勤ログの一覧にしか使っていなかった
+    conn.execute("DROP INDEX IF EXISTS idx_messages_type_created")
+
+def _migrate_deletion_jobs(conn):
+    # 従業員・会社の削除ジョブ（deletion.py）。対象の従業員は開始時に deletion_job_users に固定する
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS deletion_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scope TEXT NOT NULL,
+            target TEXT NOT NULL,
+            status TEXT NOT NULL,
+            step TEXT NOT NULL,
+            deleted_rows INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_deletion_jobs_status ON deletion_jobs (status)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS deletion_job_users (
+            job_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            PRIMARY KEY (job_id, user_id)
+        ) WITHOUT ROWID
+    ''')
+    # 削除時に「この従業員をピン留めしている行」を探すための索引
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_pinned_users_pinned ON pinned_users (pinned_user_id)")
+
+def _migrate_shift_templates(conn):
+    # 従業員ごとの定型シフト。weekdays は曜日のビットマスク（月曜 = 1 << 0 … 日曜 = 1 << 6）、時刻は 'HH:MM'
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS shift_templates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            weekdays INTEGER NOT NULL,
+            start_time TEXT NOT NULL,
+            end_time TEXT NOT NULL,
+            overnight INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_shift_templates_user ON shift_templates (user_id)")
+
+def _migrate_deletion_job_attempts(conn):
+    # 失敗した削除ジョブの自動再開は試行回数（attempts）が上限に達するまでにする
+    if 'attempts' not in _column_names(conn, 'deletion_jobs'):
+        conn.execute("ALTER TABLE deletion_jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+def _migrate_shift_user_versions(conn):
+    # 従業員ごとのシフトのデータバージョン。シフト管理のカレンダーのキャッシュキーに使う
+    # （会社未登録の従業員は会社単位のバージョンが増えないため、従業員単位で持つ）
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS shift_user_versions (
+            user_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_shifts_user_version_{event.lower()}
+            AFTER {event} ON shifts
+            BEGIN
+                INSERT INTO shift_user_versions (user_id, version) VALUES ({row}.user_id, 1)
+                ON CONFLICT (user_id) DO UPDATE SET version = version + 1;
+            END
+        ''')
+
+# (バージョン, 関数) の順序付きリスト。各ステップは冪等に書き、末尾に追加していく。
+# 適用済みのバージョンは PRAGMA user_version に記録される。
+MIGRATIONS = [
+    (1, _migrate_base_schema),
+    (2, _migrate_hot_path_indexes),
+    (3, _migrate_shift_date_columns),
+    (4, _migrate_attachment_store),
+    (5, _migrate_broadcasts),
+    (6, _migrate_unread_counters),
+    (7, _migrate_daily_work_summary),
+    (8, _migrate_shift_table_versions),
+    (9, _migrate_dm_conversations),
+    (10, _migrate_attendance_events),
+    (11, _migrate_deletion_jobs),
+    (12, _migrate_shift_templates),
+    (13, _migrate_deletion_job_attempts),
+    (14, _migrate_shift_user_versions),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+_migrated_paths = set()
+_migrate_lock = threading.Lock()
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(path=None):
+    with db_connection(path, check_plans=False) as conn:
+        if get_schema_version(conn) >= SCHEMA_VERSION:
+            return get_schema_version(conn)
+
+        for version, step in MIGRATIONS:
+            # 別プロセスと同時に起動した場合に備え、書き込みロックを取ってから再確認する
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if get_schema_version(conn) < version:
+                    step(conn)
+                    conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return get_schema_version(conn)
+
+def init_db(path=None):
+    path = path or DATABASE_NAME
+    if path in _migrated_paths:
+        return
+    with _migrate_lock:
+        if path in _migrated_paths:
+            return
+        migrate(path)
+        _migrated_paths.add(path)
 
 if __name__ == '__main__':
     print("Initializing database...")
     init_db()
-    print("Database initialized successfully.")
+    with db_connection() as conn:
+        print(f"Database initialized successfully. (schema version {get_schema_version(conn)})")
+    # 添付ファイル移行後などに空き領域をファイルから解放する（DB全体をロックするため利用の少ない時間帯に実行）
+    if 'vacuum' in sys.argv[1:]:
+        with db_connection(check_plans=False) as conn:
+            conn.execute("VACUUM")
+        print("Database vacuumed.")
+    # 集計ロジックを変更した後や不整合が疑われる時に、日次集計を勤怠データから作り直す
+    if 'rebuild-work-summary' in sys.argv[1:]:
+        with db_connection(check_plans=False) as conn:
+            rows = work_summary.rebuild(conn)
+        print(f"Daily work summary rebuilt. ({rows} days)")
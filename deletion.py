@@ -0,0 +1,175 @@
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import attendance_cache
+from database import db_connection
+
+# 従業員・会社の削除ジョブ。削除対象の従業員を deletion_job_users に固定してから、依存関係の順
+# （休憩 → 勤怠 → シフト → メッセージ → … → ピン留め → 従業員）に CHUNK_SIZE 行ずつ削除し、
+# 1チャンクごとにコミットする。進み具合は deletion_jobs に記録するため、途中で止まっても
+# 次の起動時に続きから再開できる（各ステップは何度実行しても結果が同じになるように書く）。
+JST = timezone(timedelta(hours=9), 'JST')
+CHUNK_SIZE = 500
+# 失敗したジョブを起動時に自動で再開する回数の上限。超えたものは failed のまま残し、画面にエラーを表示する
+MAX_ATTEMPTS = 3
+
+JOB_USERS = "SELECT user_id FROM deletion_job_users WHERE job_id = :job_id"
+JOB_COMPANY = "SELECT target FROM deletion_jobs WHERE id = :job_id AND scope = 'company'"
+
+# (ステップ名, 表示名, 1チャンク分を削除するSQL)
+# 2つの条件に当てはまる行（自分宛ての通知など）は UNION で1件にまとめる（重複すると削除件数が CHUNK_SIZE に届かず、ステップが途中で終わる）
+STEPS = [
+    ('breaks', "休憩記録", f"""
+        DELETE FROM breaks WHERE id IN (
+            SELECT b.id FROM attendance a JOIN breaks b ON b.attendance_id = a.id
+            WHERE a.user_id IN ({JOB_USERS}) LIMIT :limit)
+    """),
+    ('daily_work_summary', "勤務時間の集計", f"""
+        DELETE FROM daily_work_summary WHERE (user_id, work_date) IN (
+            SELECT user_id, work_date FROM daily_work_summary WHERE user_id IN ({JOB_USERS}) LIMIT :limit)
+    """),
+    ('attendance', "勤怠記録", f"""
+        DELETE FROM attendance WHERE id IN (
+            SELECT id FROM attendance WHERE user_id IN ({JOB_USERS}) LIMIT :limit)
+    """),
+    ('shifts', "シフト", f"""
+        DELETE FROM shifts WHERE id IN (
+            SELECT id FROM shifts WHERE user_id IN ({JOB_USERS}) LIMIT :limit)
+    """),
+    ('shift_templates', "定型シフト", f"""
+        DELETE FROM shift_templates WHERE id IN (
+            SELECT id FROM shift_templates WHERE user_id IN ({JOB_USERS}) LIMIT :limit)
+    """),
+    ('shift_user_versions', "シフトのバージョン", f"""
+        DELETE FROM shift_user_versions WHERE user_id IN (
+            SELECT user_id FROM shift_user_versions WHERE user_id IN ({JOB_USERS}) LIMIT :limit)
+    """),
+    ('messages', "メッセージ", f"""
+        DELETE FROM messages WHERE id IN (
+            SELECT id FROM messages WHERE user_id IN ({JOB_USERS})
+            UNION
+            SELECT id FROM messages WHERE sender_id IN ({JOB_USERS})
+            LIMIT :limit)
+    """),
+    ('broadcast_reads', "既読記録", f"""
+        DELETE FROM broadcast_reads WHERE (broadcast_id, user_id) IN (
+            SELECT broadcast_id, user_id FROM broadcast_reads WHERE user_id IN ({JOB_USERS}) LIMIT :limit)
+    """),
+    ('broadcasts', "全体メッセージ", f"""
+        DELETE FROM broadcasts WHERE id IN (
+            SELECT id FROM broadcasts WHERE company IN ({JOB_COMPANY}) LIMIT :limit)
+    """),
+    ('attendance_events', "出退勤ログ", f"""
+        DELETE FROM attendance_events WHERE id IN (
+            SELECT id FROM attendance_events WHERE user_id IN ({JOB_USERS})
+            UNION
+            SELECT id FROM attendance_events WHERE company IN ({JOB_COMPANY})
+            LIMIT :limit)
+    """),
+    # 主キーの行値で消す WITHOUT ROWID テーブルは、UNION にすると外側が全走査になるため左右を別ステップにする
+    ('dm_conversations_low', "DMの履歴", f"""
+        DELETE FROM dm_conversations WHERE (user_low, user_high) IN (
+            SELECT user_low, user_high FROM dm_conversations WHERE user_low IN ({JOB_USERS}) LIMIT :limit)
+    """),
+    ('dm_conversations_high', "DMの履歴", f"""
+        DELETE FROM dm_conversations WHERE (user_low, user_high) IN (
+            SELECT user_low, user_high FROM dm_conversations WHERE user_high IN ({JOB_USERS}) LIMIT :limit)
+    """),
+    ('unread_counters', "未読件数", f"""
+        DELETE FROM unread_counters WHERE (user_id, channel, sender_id) IN (
+            SELECT user_id, channel, sender_id FROM unread_counters WHERE user_id IN ({JOB_USERS}) LIMIT :limit)
+    """),
+    ('pinned_users', "ピン留め", f"""
+        DELETE FROM pinned_users WHERE id IN (
+            SELECT id FROM pinned_users WHERE user_id IN ({JOB_USERS})
+            UNION
+            SELECT id FROM pinned_users WHERE pinned_user_id IN ({JOB_USERS})
+            LIMIT :limit)
+    """),
+    ('users', "従業員", """
+        DELETE FROM users WHERE id IN (
+            SELECT u.id FROM deletion_job_users j JOIN users u ON u.id = j.user_id WHERE j.job_id = :job_id LIMIT :limit)
+    """),
+]
+STEP_LABELS = {name: label for name, label, _ in STEPS}
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='deletion')
+_resume_lock = threading.Lock()
+_resumed = False
+
+def create_job(scope, target):
+    # scope は 'user'（target は従業員ID）または 'company'（target は会社名）
+    now = datetime.now(JST).isoformat()
+    with db_connection() as conn:
+        cursor = conn.execute("INSERT INTO deletion_jobs (scope, target, status, step, deleted_rows, created_at, updated_at) VALUES (?, ?, 'pending', ?, 0, ?, ?)",
+                              (scope, str(target), STEPS[0][0], now, now))
+        job_id = cursor.lastrowid
+        if scope == 'company':
+            conn.execute("INSERT INTO deletion_job_users (job_id, user_id) SELECT ?, id FROM users WHERE company = ?", (job_id, target))
+        else:
+            conn.execute("INSERT INTO deletion_job_users (job_id, user_id) SELECT ?, id FROM users WHERE id = ?", (job_id, target))
+    return job_id
+
+def get_job(job_id):
+    with db_connection() as conn:
+        job = conn.execute("SELECT id, scope, target, status, step, deleted_rows, error, attempts FROM deletion_jobs WHERE id = ?", (job_id,)).fetchone()
+    return dict(job) if job else None
+
+def run_job(job_id):
+    job = get_job(job_id)
+    if job is None or job['status'] == 'done':
+        return True
+    step_names = [name for name, _, _ in STEPS]
+    try:
+        for name, _, sql in STEPS[step_names.index(job['step']):]:
+            while True:
+                # 1チャンクごとに短いトランザクションで削除と進捗の記録を行い、他の書き込みを長く待たせない
+                with db_connection() as conn:
+                    if name == 'users':
+                        for row in conn.execute("SELECT user_id FROM deletion_job_users WHERE job_id = ?", (job_id,)):
+                            attendance_cache.invalidate(row['user_id'])
+                    deleted = conn.execute(sql, {'job_id': job_id, 'limit': CHUNK_SIZE}).rowcount
+                    conn.execute("UPDATE deletion_jobs SET status = 'running', step = ?, deleted_rows = deleted_rows + ?, updated_at = ? WHERE id = ?",
+                                 (name, deleted, datetime.now(JST).isoformat(), job_id))
+                if deleted < CHUNK_SIZE:
+                    break
+        with db_connection() as conn:
+            conn.execute("DELETE FROM deletion_job_users WHERE job_id = ?", (job_id,))
+            conn.execute("UPDATE deletion_jobs SET status = 'done', error = NULL, updated_at = ? WHERE id = ?", (datetime.now(JST).isoformat(), job_id))
+        return True
+    except sqlite3.Error as e:
+        print(f"削除ジョブ {job_id} でエラーが発生しました: {e}")
+        with db_connection() as conn:
+            conn.execute("UPDATE deletion_jobs SET status = 'failed', error = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                         (str(e), datetime.now(JST).isoformat(), job_id))
+        return False
+
+def start_job(scope, target):
+    job_id = create_job(scope, target)
+    _executor.submit(run_job, job_id)
+    return job_id
+
+def resume_pending_jobs():
+    # プロセス起動後に1回だけ、終わっていないジョブ（中断したもの、失敗が MAX_ATTEMPTS 回未満のもの）をバックグラウンドで再開する
+    global _resumed
+    with _resume_lock:
+        if _resumed:
+            return
+        _resumed = True
+    with db_connection() as conn:
+        job_ids = [row['id'] for row in conn.execute("SELECT id FROM deletion_jobs WHERE status IN ('pending', 'running', 'failed') AND attempts < ? ORDER BY id",
+                                                     (MAX_ATTEMPTS,))]
+    for job_id in job_ids:
+        _executor.submit(run_job, job_id)
+
+def retries_exhausted(job):
+    return job['status'] == 'failed' and job['attempts'] >= MAX_ATTEMPTS
+
+def step_progress(job):
+    # 表示用の進み具合（0.0〜1.0）とステップ名
+    step_names = [name for name, _, _ in STEPS]
+    if job['status'] == 'done':
+        return 1.0, "完了"
+    return step_names.index(job['step']) / len(STEPS), STEP_LABELS[job['step']]
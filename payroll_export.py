@@ -0,0 +1,72 @@
+import csv
+import io
+import tempfile
+from datetime import datetime
+from database import db_connection
+from work_summary import JST
+
+# 給与計算用の月次勤怠エクスポート。1回の結合クエリの結果をジェネレーターで1行ずつ書き出し、
+# 従業員数に関わらずメモリ使用量を一定に保つ。実働・休憩・残業・深夜は出勤状況ページと同じ日次集計（daily_work_summary）を使う。
+HEADER = ('従業員ID', '名前', '役職', '勤務日', 'シフト開始', 'シフト終了', '出勤', '退勤',
+          '休憩(分)', '実働(分)', '残業(分)', '深夜(分)')
+PAYROLL_QUERY = """
+    SELECT u.employee_id, u.name, u.position, a.work_date, a.clock_in, a.clock_out,
+           s.start_datetime, s.end_datetime,
+           d.break_seconds, d.net_seconds, d.overtime_seconds, d.night_seconds
+    FROM users u
+    JOIN attendance a ON a.user_id = u.id AND a.work_date BETWEEN ? AND ?
+    LEFT JOIN daily_work_summary d ON d.user_id = a.user_id AND d.work_date = a.work_date
+    LEFT JOIN shifts s ON s.id = (SELECT MAX(id) FROM shifts WHERE user_id = a.user_id AND work_date = a.work_date)
+    WHERE u.company = ?
+    ORDER BY u.id, a.work_date
+"""
+
+def _format_datetime(value, aware):
+    if not value:
+        return ''
+    dt = datetime.fromisoformat(value)
+    return (dt.astimezone(JST) if aware else dt).strftime('%Y-%m-%d %H:%M')
+
+def _minutes(seconds):
+    return '' if seconds is None else round(seconds / 60)
+
+def iter_payroll_rows(company_name, first_day, last_day):
+    with db_connection() as conn:
+        for row in conn.execute(PAYROLL_QUERY, (first_day.isoformat(), last_day.isoformat(), company_name)):
+            yield (row['employee_id'], row['name'], row['position'], row['work_date'],
+                   _format_datetime(row['start_datetime'], aware=False), _format_datetime(row['end_datetime'], aware=False),
+                   _format_datetime(row['clock_in'], aware=True), _format_datetime(row['clock_out'], aware=True),
+                   _minutes(row['break_seconds']), _minutes(row['net_seconds']),
+                   _minutes(row['overtime_seconds']), _minutes(row['night_seconds']))
+
+def write_payroll_csv(stream, rows):
+    # Excelでそのまま開けるよう BOM 付きの UTF-8 で書く
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        writer = csv.writer(text)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    finally:
+        text.detach()
+
+def write_payroll_xlsx(stream, rows):
+    from openpyxl import Workbook  # 書き出しの時だけ読み込む
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('勤怠')
+    sheet.append(HEADER)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(stream)
+
+WRITERS = {'csv': write_payroll_csv, 'xlsx': write_payroll_xlsx}
+
+def export_payroll(stream, file_format, company_name, first_day, last_day):
+    WRITERS[file_format](stream, iter_payroll_rows(company_name, first_day, last_day))
+
+def build_payroll_file(file_format, company_name, first_day, last_day):
+    # 行はDBから順に一時ファイルへ書き出し、全件をメモリ上に組み立てない。
+    # ダウンロードボタンに渡すため、書き終えたファイルの内容を bytes で返す
+    with tempfile.TemporaryFile() as export_file:
+        export_payroll(export_file, file_format, company_name, first_day, last_day)
+        export_file.seek(0)
+        return export_file.read()
@@ -0,0 +1,137 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from database import db_connection
+from common import get_jst_now, shift_row_values
+from table_import import MissingColumnsError, cell_text, iter_rows, parse_date, parse_time
+import work_summary
+
+# シフトの一括取り込み（CSV / Excel）。1行が (従業員, 日付) の1シフトで、同じ従業員・日付の既存シフトは上書きする。
+# plan_shift_import で検証と差分の作成だけを行い（DBは変更しない）、apply_shift_import で1トランザクションで書き込む。
+COLUMNS = ('従業員ID', '日付', '開始時刻', '終了時刻')
+
+def _format_shift(start_dt, end_dt):
+    end_text = end_dt.strftime('%H:%M') if end_dt.date() == start_dt.date() else '翌' + end_dt.strftime('%H:%M')
+    return f"{start_dt.strftime('%H:%M')}～{end_text}"
+
+def _parse_row(row):
+    employee_id = cell_text(row['従業員ID'])
+    if not employee_id:
+        raise ValueError("従業員IDが空です。")
+    work_date = parse_date(row['日付'])
+    start_time = parse_time(row['開始時刻'])
+    end_time = parse_time(row['終了時刻'])
+    if start_time == end_time:
+        raise ValueError("開始時刻と終了時刻が同じです。")
+    start_dt = datetime.combine(work_date, start_time)
+    end_dt = datetime.combine(work_date, end_time)
+    # 終了時刻が開始時刻より前なら、翌日にまたがる夜勤として扱う
+    if end_dt <= start_dt:
+        end_dt += timedelta(days=1)
+    return employee_id, start_dt, end_dt
+
+def plan_shift_import(uploaded_file, company_name):
+    errors = []
+    parsed = []
+    today = get_jst_now().date()
+    try:
+        for line_number, row in iter_rows(uploaded_file, COLUMNS):
+            try:
+                employee_id, start_dt, end_dt = _parse_row(row)
+            except ValueError as e:
+                errors.append((line_number, str(e)))
+                continue
+            if start_dt.date() < today:
+                errors.append((line_number, "過去の日付のシフトは取り込めません。"))
+                continue
+            parsed.append({'line': line_number, 'employee_id': employee_id, 'start': start_dt, 'end': end_dt})
+    except MissingColumnsError as e:
+        errors.append((1, str(e)))
+
+    plan = {'inserts': [], 'updates': [], 'unchanged': 0, 'errors': errors, 'preview': [], 'refresh_days': []}
+    if not parsed:
+        return plan
+
+    first_date = min(r['start'] for r in parsed).date() - timedelta(days=1)
+    last_date = max(r['start'] for r in parsed).date() + timedelta(days=1)
+    with db_connection() as conn:
+        # 従業員IDは自分の会社の従業員だけを1回でまとめて引く
+        users = {row['employee_id']: row for row in conn.execute('SELECT id, employee_id, name FROM users WHERE company = ?', (company_name,))}
+        existing_rows = conn.execute("""
+            SELECT s.id, s.user_id, s.work_date, s.start_datetime, s.end_datetime, s.start_epoch, s.end_epoch
+            FROM users u JOIN shifts s ON s.user_id = u.id
+            WHERE u.company = ? AND s.work_date BETWEEN ? AND ?
+        """, (company_name, first_date.isoformat(), last_date.isoformat())).fetchall()
+
+    existing = {(row['user_id'], row['work_date']): row for row in existing_rows}
+    rows_by_user = defaultdict(list)
+    seen = {}
+    for r in parsed:
+        user = users.get(r['employee_id'])
+        if user is None:
+            errors.append((r['line'], f"従業員ID {r['employee_id']} の従業員が見つかりません。"))
+            continue
+        r['user'] = user
+        r['values'] = shift_row_values(r['start'], r['end'])
+        key = (user['id'], r['values'][2])
+        if key in seen:
+            errors.append((r['line'], f"{seen[key]}行目と同じ従業員・日付のシフトです。"))
+            continue
+        seen[key] = r['line']
+        rows_by_user[user['id']].append(r)
+
+    # 重なりの確認: 取り込む行どうし、および上書きされずに残る既存シフトとの間で時間帯が重ならないこと
+    for row in existing_rows:
+        if (row['user_id'], row['work_date']) not in seen and row['user_id'] in rows_by_user:
+            rows_by_user[row['user_id']].append({'line': None, 'values': (None, None, row['work_date'], row['start_epoch'], row['end_epoch'])})
+    overlapping = set()
+    for user_rows in rows_by_user.values():
+        user_rows.sort(key=lambda r: r['values'][3])
+        for previous, current in zip(user_rows, user_rows[1:]):
+            if current['values'][3] < previous['values'][4]:
+                for r in (current, previous):
+                    if r['line'] is not None and r['line'] not in overlapping:
+                        overlapping.add(r['line'])
+                        other = previous if r is current else current
+                        where = f"{other['line']}行目" if other['line'] is not None else f"{other['values'][2]} の登録済み"
+                        errors.append((r['line'], f"{where}のシフトと時間帯が重なっています。"))
+
+    for user_rows in rows_by_user.values():
+        for r in user_rows:
+            if r['line'] is None or r['line'] in overlapping:
+                continue
+            values = r['values']
+            current = existing.get((r['user']['id'], values[2]))
+            if current is None:
+                plan['inserts'].append((r['user']['id'],) + values)
+                kind, before = '追加', ''
+            elif (current['start_datetime'], current['end_datetime']) == values[:2]:
+                plan['unchanged'] += 1
+                continue
+            else:
+                plan['updates'].append(values + (current['id'], current['start_datetime'], current['end_datetime']))
+                kind = '変更'
+                before = _format_shift(datetime.fromisoformat(current['start_datetime']), datetime.fromisoformat(current['end_datetime']))
+            plan['refresh_days'].append((r['user']['id'], values[2]))
+            plan['preview'].append({'行': r['line'], '区分': kind, '従業員ID': r['employee_id'], '名前': r['user']['name'],
+                                    '日付': values[2], '変更前': before, '変更後': _format_shift(r['start'], r['end'])})
+
+    plan['preview'].sort(key=lambda p: p['行'])
+    errors.sort(key=lambda e: e[0])
+    return plan
+
+def apply_shift_import(plan):
+    # 確認後に別の画面でシフトが登録・変更されていた行は取り込まない（追加は空いている日だけ、
+    # 変更は確認時と同じ内容のままの行だけを書き換える）。戻り値は (追加, 変更, 取り込まなかった) の件数
+    with db_connection() as conn:
+        inserted = conn.executemany('''
+            INSERT INTO shifts (user_id, start_datetime, end_datetime, work_date, start_epoch, end_epoch)
+            SELECT ?, ?, ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM shifts WHERE user_id = ? AND work_date = ?)
+        ''', [row + (row[0], row[3]) for row in plan['inserts']]).rowcount
+        updated = conn.executemany('''
+            UPDATE shifts SET start_datetime = ?, end_datetime = ?, work_date = ?, start_epoch = ?, end_epoch = ?
+            WHERE id = ? AND start_datetime = ? AND end_datetime = ?
+        ''', plan['updates']).rowcount
+        # 残業時間はシフトの終了時刻に依存するため、既に勤怠のある日は集計を更新する
+        for user_id, work_date in plan['refresh_days']:
+            work_summary.refresh_day(conn, user_id, work_date)
+    return inserted, updated, len(plan['inserts']) + len(plan['updates']) - inserted - updated
@@ -0,0 +1,92 @@
+from datetime import datetime, time, timedelta
+from database import db_connection
+from common import get_jst_now, shift_row_values
+import work_summary
+
+# 定型シフト（曜日パターン + 開始・終了時刻）。期間内の該当日のシフトを1トランザクションでまとめて作る。
+WEEKDAY_JP = ['月', '火', '水', '木', '金', '土', '日']
+SKIP_EXISTING = 'skip'
+OVERWRITE_EXISTING = 'overwrite'
+
+def weekday_mask(weekdays):
+    mask = 0
+    for weekday in weekdays:
+        mask |= 1 << weekday
+    return mask
+
+def mask_weekdays(mask):
+    return [weekday for weekday in range(7) if mask & (1 << weekday)]
+
+def describe_template(template):
+    days = '・'.join(WEEKDAY_JP[d] for d in mask_weekdays(template['weekdays']))
+    end_text = ('翌' if template['overnight'] else '') + template['end_time']
+    return f"{template['name']}（{days} {template['start_time']}～{end_text}）"
+
+def get_templates(user_id):
+    with db_connection() as conn:
+        return conn.execute('SELECT id, name, weekdays, start_time, end_time, overnight FROM shift_templates WHERE user_id = ? ORDER BY id',
+                            (user_id,)).fetchall()
+
+def save_template(user_id, name, weekdays, start_time, end_time, overnight):
+    # 入力に問題があればエラーメッセージを返す
+    if not name.strip():
+        return "テンプレート名を入力してください。"
+    if not weekdays:
+        return "曜日を1つ以上選んでください。"
+    if not overnight and start_time >= end_time:
+        return "終了時刻は開始時刻より後にしてください（日をまたぐ場合は「翌日まで」にチェックを入れてください）。"
+    if overnight and end_time > start_time:
+        return "翌日までのシフトは、24時間を超えないよう終了時刻を開始時刻以前にしてください。"
+    with db_connection() as conn:
+        conn.execute('INSERT INTO shift_templates (user_id, name, weekdays, start_time, end_time, overnight, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                     (user_id, name.strip(), weekday_mask(weekdays), start_time.strftime('%H:%M'), end_time.strftime('%H:%M'),
+                      int(overnight), get_jst_now().isoformat()))
+    return None
+
+def delete_template(user_id, template_id):
+    with db_connection() as conn:
+        conn.execute('DELETE FROM shift_templates WHERE id = ? AND user_id = ?', (template_id, user_id))
+
+def iter_template_shifts(template, first_day, last_day):
+    start_time = time.fromisoformat(template['start_time'])
+    end_time = time.fromisoformat(template['end_time'])
+    weekdays = set(mask_weekdays(template['weekdays']))
+    day = first_day
+    while day <= last_day:
+        if day.weekday() in weekdays:
+            end_day = day + timedelta(days=1) if template['overnight'] else day
+            yield datetime.combine(day, start_time), datetime.combine(end_day, end_time)
+        day += timedelta(days=1)
+
+def generate_shifts(user_id, template_id, first_day, last_day, policy=SKIP_EXISTING):
+    # 過去の日は変更しない。登録済みの日は policy に従って飛ばすか上書きする。戻り値は (追加, 上書き, 飛ばした) の件数
+    first_day = max(first_day, get_jst_now().date())
+    with db_connection() as conn:
+        template = conn.execute('SELECT name, weekdays, start_time, end_time, overnight FROM shift_templates WHERE id = ? AND user_id = ?',
+                                (template_id, user_id)).fetchone()
+        if template is None or first_day > last_day:
+            return 0, 0, 0
+        existing = {row['work_date']: row['id'] for row in conn.execute(
+            'SELECT id, work_date FROM shifts WHERE user_id = ? AND work_date BETWEEN ? AND ?',
+            (user_id, first_day.isoformat(), last_day.isoformat()))}
+
+        inserts, updates, skipped = [], [], 0
+        for start_dt, end_dt in iter_template_shifts(template, first_day, last_day):
+            values = shift_row_values(start_dt, end_dt)
+            shift_id = existing.get(values[2])
+            if shift_id is None:
+                inserts.append((user_id,) + values)
+            elif policy == OVERWRITE_EXISTING:
+                updates.append(values + (shift_id,))
+            else:
+                skipped += 1
+        conn.executemany('INSERT INTO shifts (user_id, start_datetime, end_datetime, work_date, start_epoch, end_epoch) VALUES (?, ?, ?, ?, ?, ?)',
+                         inserts)
+        conn.executemany('UPDATE shifts SET start_datetime = ?, end_datetime = ?, work_date = ?, start_epoch = ?, end_epoch = ? WHERE id = ?',
+                         updates)
+        # 残業時間はシフトの終了時刻に依存するため、既に勤怠のある日は集計を更新する
+        for row in inserts:
+            work_summary.refresh_day(conn, user_id, row[3])
+        for row in updates:
+            work_summary.refresh_day(conn, user_id, row[2])
+    return len(inserts), len(updates), skipped
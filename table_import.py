@@ -0,0 +1,99 @@
+import codecs
+import csv
+import io
+from datetime import date, datetime, time
+
+# CSV / Excel(.xlsx) ファイルの取り込み。1行目を見出しとして、(行番号, {見出し: 値}) を1行ずつ返す。
+# ファイル全体を一度に読み込まず、CSVは行単位、Excelは openpyxl の読み取り専用モードで順に読む。
+SNIFF_BYTES = 64 * 1024
+
+def _detect_encoding(stream):
+    # Excelで保存したCSVは Shift_JIS（cp932）のことが多いため、先頭がUTF-8として読めなければ cp932 とみなす
+    sample = stream.read(SNIFF_BYTES)
+    stream.seek(0)
+    try:
+        codecs.getincrementaldecoder('utf-8-sig')().decode(sample, final=False)
+        return 'utf-8-sig'
+    except UnicodeDecodeError:
+        return 'cp932'
+
+def _is_blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+def _clean(value):
+    return value.strip() if isinstance(value, str) else value
+
+class MissingColumnsError(ValueError):
+    pass
+
+def _iter_records(header, rows, columns):
+    # 見出しは行を読み始める前に1度だけ確認する。セルが足りない行は空欄として補う
+    keys = ['' if h is None else str(h).strip() for h in header or ()]
+    missing = [column for column in columns if column not in keys]
+    if missing:
+        raise MissingColumnsError(f"見出しに {'、'.join(missing)} がありません。")
+    for line_number, values in enumerate(rows, start=2):
+        values = list(values)
+        if all(_is_blank(v) for v in values):
+            continue
+        values += [None] * (len(keys) - len(values))
+        yield line_number, {key: _clean(value) for key, value in zip(keys, values)}
+
+def _iter_csv_rows(stream, columns):
+    text = io.TextIOWrapper(stream, encoding=_detect_encoding(stream), newline='')
+    try:
+        reader = csv.reader(text)
+        yield from _iter_records(next(reader, None), reader, columns)
+    finally:
+        text.detach()
+
+def _iter_xlsx_rows(stream, columns):
+    from openpyxl import load_workbook  # 取り込みの時だけ読み込む
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        yield from _iter_records(next(rows, None), rows, columns)
+    finally:
+        workbook.close()
+
+def iter_rows(uploaded_file, columns):
+    # 必要な見出しが揃っていなければ、最初の行を読む時点で MissingColumnsError を送出する
+    if (uploaded_file.name or '').lower().endswith('.xlsx'):
+        return _iter_xlsx_rows(uploaded_file, columns)
+    return _iter_csv_rows(uploaded_file, columns)
+
+def cell_text(value):
+    # Excelの数値セル（1001.0 など）も文字列の "1001" として扱う
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+def parse_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = cell_text(value).replace('/', '-')
+    if not text:
+        raise ValueError("日付が入力されていません。")
+    try:
+        return datetime.strptime(text, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"日付「{text}」を読み取れません（例: 2025-04-01）。") from None
+
+def parse_time(value):
+    if isinstance(value, datetime):
+        return value.time()
+    if isinstance(value, time):
+        return value
+    text = cell_text(value)
+    if not text:
+        raise ValueError("時刻が入力されていません。")
+    for time_format in ('%H:%M', '%H:%M:%S'):
+        try:
+            return datetime.strptime(text, time_format).time()
+        except ValueError:
+            pass
+    raise ValueError(f"時刻「{text}」を読み取れません（例: 09:00）。")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# リポジトリ直下のモジュール（database, common, views …）をテストから import できるようにする
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,46 @@
+import pytest
+
+import database
+import deletion
+
+# 削除ジョブは CHUNK_SIZE 行ずつ消していくため、チャンクの境界をまたぐ量の行を持つ従業員で確かめる
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'attendance.db')
+    database.init_db(path)
+    monkeypatch.setattr(deletion, 'db_connection', lambda: database.db_connection(path, check_plans=True))
+    monkeypatch.setattr(deletion, 'CHUNK_SIZE', 3)
+    yield path
+    database.get_pool(path).close_all()
+
+def _add_user(conn, employee_id, company='会社'):
+    return conn.execute("INSERT INTO users (name, employee_id, password_hash, created_at, company, position) VALUES (?, ?, 'x', '2025-04-01T09:00:00+09:00', ?, 'バイト')",
+                        (f"従業員{employee_id}", employee_id, company)).lastrowid
+
+def test_user_deletion_crosses_chunk_boundaries(db_path):
+    with database.db_connection(db_path) as conn:
+        user_id = _add_user(conn, '1001')
+        partner_id = _add_user(conn, '1002')
+        # 自分宛ての通知は user_id と sender_id の両方に当てはまる
+        conn.execute("INSERT INTO messages (user_id, sender_id, content, created_at, message_type) VALUES (?, ?, 'お知らせ', '2025-04-02T10:00:00+09:00', 'SYSTEM')",
+                     (user_id, user_id))
+        for i in range(3):
+            conn.execute("INSERT INTO messages (user_id, sender_id, content, created_at, message_type, is_read) VALUES (?, ?, 'こんにちは', ?, 'DIRECT', 0)",
+                         (partner_id, user_id, f"2025-04-02T11:0{i}:00+09:00"))
+        for i in range(4):
+            conn.execute("INSERT INTO attendance_events (company, user_id, kind, content, created_at) VALUES ('会社', ?, 'clock_in', '出勤', ?)",
+                         (user_id, f"2025-04-0{i + 1}T09:00:00+09:00"))
+        conn.execute("INSERT INTO pinned_users (user_id, pinned_user_id) VALUES (?, ?)", (user_id, user_id))
+        conn.execute("INSERT INTO pinned_users (user_id, pinned_user_id) VALUES (?, ?)", (user_id, partner_id))
+        conn.execute("INSERT INTO pinned_users (user_id, pinned_user_id) VALUES (?, ?)", (partner_id, user_id))
+
+    job_id = deletion.create_job('user', user_id)
+    assert deletion.run_job(job_id)
+    assert deletion.get_job(job_id)['status'] == 'done'
+
+    with database.db_connection(db_path, check_plans=False) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM users WHERE id = ?", (user_id,)).fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM messages WHERE user_id = ? OR sender_id = ?", (user_id, user_id)).fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM attendance_events WHERE user_id = ?", (user_id,)).fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM pinned_users WHERE user_id = ? OR pinned_user_id = ?", (user_id, user_id)).fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM users WHERE id = ?", (partner_id,)).fetchone()[0] == 1
@@ -0,0 +1,19 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# ログイン画面とタイムカードの表示に必要なモジュールだけで起動できること（重い依存は各ページで初めて読み込む）
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'matplotlib', 'altair', 'streamlit_calendar', 'dateutil', 'openpyxl')
+
+def test_startup_does_not_import_heavy_modules():
+    pytest.importorskip('streamlit')
+    code = (
+        "import sys\n"
+        "import app, views.login, views.timecard\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''
@@ -0,0 +1,41 @@
+import csv
+import io
+from datetime import date
+
+import pytest
+
+import database
+import payroll_export
+import work_summary
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'attendance.db')
+    database.init_db(path)
+    monkeypatch.setattr(payroll_export, 'db_connection', lambda: database.db_connection(path, check_plans=True))
+    with database.db_connection(path) as conn:
+        user_id = conn.execute("INSERT INTO users (name, employee_id, password_hash, created_at, company, position) VALUES ('山田', '1001', 'x', '2025-04-01T09:00:00+09:00', '会社', 'バイト')").lastrowid
+        conn.execute("INSERT INTO shifts (user_id, start_datetime, end_datetime, work_date, start_epoch, end_epoch) VALUES (?, '2025-04-02T09:00:00', '2025-04-02T18:00:00', '2025-04-02', 1743552000, 1743584400)", (user_id,))
+        attendance_id = conn.execute("INSERT INTO attendance (user_id, work_date, clock_in, clock_out) VALUES (?, '2025-04-02', '2025-04-02T09:00:00+09:00', '2025-04-02T18:30:00+09:00')", (user_id,)).lastrowid
+        conn.execute("INSERT INTO breaks (attendance_id, break_start, break_end) VALUES (?, '2025-04-02T12:00:00+09:00', '2025-04-02T13:00:00+09:00')", (attendance_id,))
+        work_summary.refresh_attendance(conn, attendance_id)
+    yield path
+    database.get_pool(path).close_all()
+
+def test_csv_export_rows(db_path):
+    data = payroll_export.build_payroll_file('csv', '会社', date(2025, 4, 1), date(2025, 4, 30))
+    rows = list(csv.reader(io.StringIO(data.decode('utf-8-sig'))))
+    assert rows[0] == list(payroll_export.HEADER)
+    assert rows[1] == ['1001', '山田', 'バイト', '2025-04-02', '2025-04-02 09:00', '2025-04-02 18:00',
+                       '2025-04-02 09:00', '2025-04-02 18:30', '60', '510', '30', '0']
+
+@pytest.mark.parametrize('file_format', ['csv', 'xlsx'])
+def test_export_can_be_passed_to_download_button(db_path, file_format):
+    if file_format == 'xlsx':
+        pytest.importorskip('openpyxl')
+    marshall_file = pytest.importorskip('streamlit.elements.widgets.button').marshall_file
+    from streamlit.proto.DownloadButton_pb2 import DownloadButton as DownloadButtonProto
+
+    data = payroll_export.build_payroll_file(file_format, '会社', date(2025, 4, 1), date(2025, 4, 30))
+    assert data
+    marshall_file('test', data, DownloadButtonProto(), None, file_name=f"勤怠_202504.{file_format}")
@@ -0,0 +1,136 @@
+import ast
+import importlib
+import os
+import re
+
+import sqlite3
+
+import pytest
+
+import database
+
+# アプリが発行するSQL（ソース中の文字列リテラル）とトリガー本体の全文について EXPLAIN QUERY PLAN を取り、
+# テーブル全走査（SCAN <table>）がないことを確認する。マイグレーション（database.py）は一度きりの処理なので対象外。
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SQL_START = re.compile(r'\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\s', re.S)
+EXCLUDED_FILES = {'database.py'}
+
+def _app_source_files():
+    for directory in (REPO_DIR, os.path.join(REPO_DIR, 'views')):
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.py') and name not in EXCLUDED_FILES:
+                yield os.path.join(directory, name)
+
+def _render(node, constants):
+    # f文字列は、モジュール直下の文字列定数を展開し、IN (...) の {placeholders} は ? 1つ、
+    # キーセット条件などその他の差し込みは空文字（条件なしの形）として組み立てる
+    if isinstance(node, ast.Constant):
+        return node.value
+    parts = []
+    for value in node.values:
+        if isinstance(value, ast.Constant):
+            parts.append(value.value)
+        elif isinstance(value.value, ast.Name) and value.value.id in constants:
+            parts.append(_render(constants[value.value.id], constants))
+        elif isinstance(value.value, ast.Name) and value.value.id == 'placeholders':
+            parts.append('?')
+        else:
+            parts.append('')
+    return ''.join(parts)
+
+def _is_string(node):
+    return (isinstance(node, ast.Constant) and isinstance(node.value, str)) or isinstance(node, ast.JoinedStr)
+
+def collect_app_queries():
+    queries = []
+    for path in _app_source_files():
+        with open(path, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        constants = {
+            stmt.targets[0].id: stmt.value for stmt in tree.body
+            if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name) and _is_string(stmt.value)
+        }
+        # f文字列の部品（ast.Constant）を単独のSQLとして拾わないよう、f文字列の中身は辿らない
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            if _is_string(node):
+                sql = _render(node, constants)
+                if SQL_START.match(sql):
+                    queries.append((f"{os.path.relpath(path, REPO_DIR)}:{node.lineno}", sql))
+                continue
+            stack.extend(ast.iter_child_nodes(node))
+    return sorted(queries)
+
+def trigger_statements(conn):
+    statements = []
+    for name, sql in conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' ORDER BY name"):
+        body = sql[re.search(r'\bBEGIN\b', sql).end():sql.rindex('END')]
+        for statement in body.split(';'):
+            if statement.strip():
+                statements.append((name, re.sub(r'\b(NEW|OLD)\.\w+', '?', statement)))
+    return statements
+
+def _bind_params(sql):
+    # 値は実行計画に影響しないため、プレースホルダーの数（名前付きなら名前）だけ合わせる
+    without_literals = re.sub(r"'[^']*'", "''", sql)
+    names = re.findall(r'(?<![:\w]):(\w+)', without_literals)
+    if names:
+        return {name: 1 for name in names}
+    return [1] * without_literals.count('?')
+
+@pytest.fixture(scope='module')
+def seeded_db(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('plans') / 'attendance.db')
+    database.init_db(path)
+    with database.db_connection(path, check_plans=False) as conn:
+        for i in range(1, 21):
+            company = f"会社{i % 3}"
+            conn.execute("INSERT INTO users (name, employee_id, password_hash, created_at, company, position) VALUES (?, ?, 'x', '2025-04-01T09:00:00+09:00', ?, 'バイト')",
+                         (f"従業員{i}", str(1000 + i), company))
+            conn.execute("INSERT INTO shifts (user_id, start_datetime, end_datetime, work_date, start_epoch, end_epoch) VALUES (?, '2025-04-02T09:00:00', '2025-04-02T18:00:00', '2025-04-02', 1743552000, 1743584400)", (i,))
+            attendance_id = conn.execute("INSERT INTO attendance (user_id, work_date, clock_in, clock_out) VALUES (?, '2025-04-02', '2025-04-02T09:00:00+09:00', '2025-04-02T18:30:00+09:00')", (i,)).lastrowid
+            conn.execute("INSERT INTO breaks (attendance_id, break_start, break_end) VALUES (?, '2025-04-02T12:00:00+09:00', '2025-04-02T13:00:00+09:00')", (attendance_id,))
+            conn.execute("INSERT INTO messages (user_id, sender_id, content, created_at, message_type) VALUES (?, ?, 'お知らせ', '2025-04-02T10:00:00+09:00', 'SYSTEM')", (i, i))
+            conn.execute("INSERT INTO messages (user_id, sender_id, content, created_at, message_type, is_read) VALUES (?, ?, 'こんにちは', '2025-04-02T11:00:00+09:00', 'DIRECT', 0)", (i, i % 20 + 1))
+            conn.execute("INSERT INTO broadcasts (company, sender_id, content, created_at) VALUES (?, ?, '全体連絡', '2025-04-02T12:00:00+09:00')", (company, i))
+            conn.execute("INSERT INTO attendance_events (company, user_id, kind, content, created_at) VALUES (?, ?, 'clock_in', '出勤', '2025-04-02T09:00:00+09:00')", (company, i))
+    yield path
+    database.get_pool(path).close_all()
+
+@pytest.fixture(scope='module')
+def seeded_conn(seeded_db):
+    # 実行計画の取得はプール外の接続で行う（プールの接続は同じスレッドで入れ子に共有されるため）
+    conn = sqlite3.connect(seeded_db)
+    yield conn
+    conn.close()
+
+APP_QUERIES = collect_app_queries()
+
+def test_app_queries_were_collected():
+    assert len(APP_QUERIES) > 50
+
+@pytest.mark.parametrize('location, sql', APP_QUERIES, ids=[location for location, _ in APP_QUERIES])
+def test_app_query_has_no_full_scan(seeded_conn, location, sql):
+    assert database.find_full_scans(seeded_conn, sql, _bind_params(sql)) == []
+
+def test_trigger_statements_have_no_full_scan(seeded_conn):
+    statements = trigger_statements(seeded_conn)
+    assert statements
+    violations = [(name, detail) for name, sql in statements for detail in database.find_full_scans(seeded_conn, sql, _bind_params(sql))]
+    assert violations == []
+
+# キーセット条件を組み立てて発行するクエリは、実際に呼び出して実行時の検査（check_plans）に掛ける
+@pytest.mark.parametrize('module_name, call', [
+    ('views.messages', lambda m: m.fetch_message_feed(1, before=('2025-04-02T12:00:00+09:00', 'SYSTEM', 1), limit=20)),
+    ('views.messages', lambda m: m.fetch_message_feed(1, since=('2025-04-01T00:00:00+09:00', 'BROADCAST', 1))),
+    ('views.messages', lambda m: m.fetch_attendance_log('会社1', before=('2025-04-03T00:00:00+09:00', 1), limit=50)),
+    ('views.messages', lambda m: m.fetch_attendance_log('会社1', since=('2025-04-01T00:00:00+09:00', 1))),
+    ('views.direct_messages', lambda m: m.fetch_dm_messages(1, 2, before=('2025-04-03T00:00:00+09:00', 1), limit=30)),
+    ('views.direct_messages', lambda m: m.fetch_dm_messages(1, 2, after=('2025-04-01T00:00:00+09:00', 1))),
+])
+def test_keyset_queries_have_no_full_scan(seeded_db, monkeypatch, module_name, call):
+    pytest.importorskip('streamlit')
+    module = importlib.import_module(module_name)
+    monkeypatch.setattr(module, 'db_connection', lambda: database.db_connection(seeded_db, check_plans=True))
+    call(module)
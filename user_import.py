@@ -0,0 +1,72 @@
+from database import db_connection
+from common import get_jst_now, hash_password, validate_password
+from table_import import MissingColumnsError, cell_text, iter_rows
+
+# 従業員の一括登録（CSV / Excel）。エラーの行は理由を返して飛ばし、残りの行は1トランザクションでまとめて登録する。
+COLUMNS = ('名前', '従業員ID', '役職', '初期パスワード')
+POSITIONS = ("役職者", "社員", "バイト")
+LOOKUP_CHUNK_SIZE = 500
+
+def _validate_row(row):
+    name = cell_text(row['名前'])
+    employee_id = cell_text(row['従業員ID'])
+    position = cell_text(row['役職'])
+    password = cell_text(row['初期パスワード'])
+    if not (name and employee_id and password):
+        raise ValueError("名前、従業員ID、パスワードは必須項目です。")
+    if not employee_id.isdigit():
+        raise ValueError("従業員IDは数字で入力してください。")
+    if position not in POSITIONS:
+        raise ValueError(f"役職は {'、'.join(POSITIONS)} のいずれかを入力してください。")
+    password_errors = validate_password(password)
+    if password_errors:
+        raise ValueError("パスワードは以下の要件を満たす必要があります：" + "".join(password_errors))
+    return name, employee_id, position, password
+
+def _existing_employee_ids(conn, employee_ids):
+    existing = set()
+    for i in range(0, len(employee_ids), LOOKUP_CHUNK_SIZE):
+        chunk = employee_ids[i:i + LOOKUP_CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(chunk))
+        existing.update(row[0] for row in conn.execute(f'SELECT employee_id FROM users WHERE employee_id IN ({placeholders})', chunk))
+    return existing
+
+def import_users(uploaded_file, company):
+    errors = []
+    valid = []
+    seen = {}
+    try:
+        for line_number, row in iter_rows(uploaded_file, COLUMNS):
+            try:
+                name, employee_id, position, password = _validate_row(row)
+            except ValueError as e:
+                errors.append((line_number, str(e)))
+                continue
+            if employee_id in seen:
+                errors.append((line_number, f"従業員ID {employee_id} は{seen[employee_id]}行目と重複しています。"))
+                continue
+            seen[employee_id] = line_number
+            valid.append((line_number, name, employee_id, position, password))
+    except MissingColumnsError as e:
+        errors.append((1, str(e)))
+
+    registered = []
+    if valid:
+        now = get_jst_now().isoformat()
+        with db_connection() as conn:
+            # 従業員IDは全社で一意のため、既に使われているIDをまとめて調べてその行だけを飛ばす。
+            # 調べてから登録するまでに別の画面で同じIDが登録されないよう、先に書き込みロックを取る
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            taken = _existing_employee_ids(conn, [r[2] for r in valid])
+            rows = []
+            for line_number, name, employee_id, position, password in valid:
+                if employee_id in taken:
+                    errors.append((line_number, f"従業員ID {employee_id} は既に使用されています。"))
+                    continue
+                rows.append((name, employee_id, hash_password(password), now, company, position))
+                registered.append((line_number, name, employee_id))
+            conn.executemany('INSERT INTO users (name, employee_id, password_hash, created_at, company, position) VALUES (?, ?, ?, ?, ?, ?)', rows)
+
+    errors.sort(key=lambda e: e[0])
+    return registered, errors
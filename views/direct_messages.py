@@ -0,0 +1,155 @@
+import streamlit as st
+from datetime import datetime
+import sqlite3
+from database import db_connection
+from common import get_jst_now, render_lazy_attachment, save_uploaded_file
+
+def add_direct_message(sender_id, recipient_id, content, attachment_id=None, file_name=None, file_type=None):
+    now = get_jst_now().isoformat()
+    try:
+        with db_connection() as conn:
+            conn.execute('INSERT INTO messages (user_id, sender_id, content, created_at, attachment_id, file_name, file_type, message_type) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                         (recipient_id, sender_id, content, now, attachment_id, file_name, file_type, 'DIRECT'))
+    except sqlite3.Error as e:
+        print(f"ダイレクトメッセージの送信に失敗しました: {e}")
+
+# DM画面は直近の DM_PAGE_SIZE 件だけを読み、読み込み済みの範囲はセッション（dm_window）に保持する。
+# 再実行時は最後に読んだメッセージより新しいものだけを、遡る時はカーソルより古い1ページ分だけを取得する。
+# カーソルは (created_at, id) の組。
+DM_PAGE_SIZE = 30
+
+def fetch_dm_messages(user_id, partner_id, before=None, after=None, limit=None):
+    conditions, params = "", [user_id, partner_id, partner_id, user_id]
+    if before is not None:
+        conditions += " AND m.created_at <= ? AND (m.created_at, m.id) < (?, ?)"
+        params += [before[0], before[0], before[1]]
+    if after is not None:
+        conditions += " AND m.created_at >= ? AND (m.created_at, m.id) > (?, ?)"
+        params += [after[0], after[0], after[1]]
+    query = f"""
+        SELECT m.id, m.sender_id, m.content, m.created_at, a.sha256, m.file_name, m.file_type
+        FROM messages m LEFT JOIN attachments a ON a.id = m.attachment_id
+        WHERE m.message_type = 'DIRECT' AND ((m.user_id = ? AND m.sender_id = ?) OR (m.user_id = ? AND m.sender_id = ?)){conditions}
+        ORDER BY m.created_at DESC, m.id DESC
+    """
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    with db_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+    return [dict(row) for row in reversed(rows)]
+
+def dm_cursor(msg):
+    return (msg['created_at'], msg['id'])
+
+def load_dm_window(user_id, partner_id):
+    window = st.session_state.dm_window
+    if window is None or window['partner_id'] != partner_id:
+        messages = fetch_dm_messages(user_id, partner_id, limit=DM_PAGE_SIZE + 1)
+        window = {'partner_id': partner_id, 'has_older': len(messages) > DM_PAGE_SIZE, 'messages': messages[-DM_PAGE_SIZE:]}
+    elif window['messages']:
+        window['messages'] += fetch_dm_messages(user_id, partner_id, after=dm_cursor(window['messages'][-1]))
+    else:
+        window['messages'] = fetch_dm_messages(user_id, partner_id, limit=DM_PAGE_SIZE)
+    st.session_state.dm_window = window
+    return window
+
+def load_older_dm_messages(user_id, partner_id):
+    window = st.session_state.dm_window
+    older = fetch_dm_messages(user_id, partner_id, before=dm_cursor(window['messages'][0]), limit=DM_PAGE_SIZE + 1)
+    window['has_older'] = len(older) > DM_PAGE_SIZE
+    window['messages'] = older[-DM_PAGE_SIZE:] + window['messages']
+
+def render_dm_chat_window(recipient_id, recipient_name):
+    st.subheader(f"💬 {recipient_name}さんとのメッセージ")
+    
+    current_user_id = st.session_state.user_id
+    with db_connection() as conn:
+        # 未読が残っている時だけ既読にする（件数はトリガーで管理している unread_counters を見る）
+        unread = conn.execute("SELECT unread_count FROM unread_counters WHERE user_id = ? AND channel = 'DIRECT' AND sender_id = ?",
+                              (current_user_id, recipient_id)).fetchone()
+        if unread and unread['unread_count'] > 0:
+            conn.execute("UPDATE messages SET is_read = 1 WHERE user_id = ? AND sender_id = ? AND is_read = 0 AND message_type = 'DIRECT'",
+                         (current_user_id, recipient_id))
+
+    window = load_dm_window(current_user_id, recipient_id)
+
+    chat_container = st.container(height=500)
+    with chat_container:
+        if window['has_older'] and st.button("以前のメッセージを読み込む", key=f"dm_older_{recipient_id}", use_container_width=True):
+            load_older_dm_messages(current_user_id, recipient_id)
+            st.rerun()
+
+        for msg in window['messages']:
+            role = "user" if msg['sender_id'] == current_user_id else "assistant"
+            
+            with st.chat_message(role):
+                if msg['content']:
+                    st.markdown(msg['content'])
+                if msg['sha256']:
+                    render_lazy_attachment(f"DIRECT_{msg['id']}", msg['sha256'], msg['file_name'], msg['file_type'], f"📎 {msg['file_name']}")
+                st.caption(datetime.fromisoformat(msg['created_at']).strftime('%H:%M'))
+
+    with st.form(key=f"dm_form_{recipient_id}", clear_on_submit=True):
+        message_input = st.text_area("メッセージを入力...", key=f"dm_input_{recipient_id}", label_visibility="collapsed", height=100)
+        file_input = st.file_uploader("ファイルを添付", key=f"dm_file_{recipient_id}", label_visibility="collapsed")
+
+        submitted = st.form_submit_button("送信")
+        
+        if submitted:
+            if message_input or file_input:
+                attachment_id, file_name, file_type = None, None, None
+                if file_input:
+                    attachment_id = save_uploaded_file(file_input)
+                    file_name = file_input.name
+                    file_type = file_input.type
+
+                add_direct_message(current_user_id, recipient_id, message_input, attachment_id, file_name, file_type)
+                st.rerun()
+
+def show_direct_message_page():
+    selected_user_id = st.session_state.get('dm_selected_user_id')
+
+    if selected_user_id:
+        with db_connection() as conn:
+            recipient_info = conn.execute("SELECT name FROM users WHERE id = ?", (selected_user_id,)).fetchone()
+
+        if recipient_info:
+            if st.button("＜ 宛先リストに戻る"):
+                st.session_state.dm_selected_user_id = None
+                st.rerun()
+            render_dm_chat_window(selected_user_id, recipient_info['name'])
+        else:
+            st.error("ユーザーが見つかりませんでした。")
+            st.session_state.dm_selected_user_id = None
+            st.rerun()
+
+    else:
+        st.header("ダイレクトメッセージ")
+        st.subheader("宛先リスト")
+
+        # 同じ会社の従業員と、その相手とのDM要約（dm_conversations）を結合し、未読あり → 最終メッセージが新しい順に並べる
+        current_user_id = st.session_state.user_id
+        with db_connection() as conn:
+            sorted_users = conn.execute("""
+                SELECT u.id, u.name,
+                       COALESCE(CASE WHEN c.user_low = :uid THEN c.unread_low ELSE c.unread_high END, 0) > 0 AS has_unread
+                FROM users u
+                LEFT JOIN dm_conversations c ON c.user_low = MIN(u.id, :uid) AND c.user_high = MAX(u.id, :uid)
+                WHERE u.company = :company AND u.id != :uid
+                ORDER BY has_unread DESC, c.last_message_at IS NULL, c.last_message_at DESC, u.id
+            """, {"uid": current_user_id, "company": st.session_state.user_company}).fetchall()
+
+        if not sorted_users:
+            st.info("メッセージを送る相手がいません。")
+            return
+
+        with st.container(height=600):
+            for user in sorted_users:
+                label = user['name']
+                if user['has_unread']:
+                    label = f"🔴 {label}"
+                if st.button(label, key=f"select_dm_{user['id']}", use_container_width=True):
+                    st.session_state.dm_selected_user_id = user['id']
+                    st.rerun()
+            
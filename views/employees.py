@@ -0,0 +1,68 @@
+import streamlit as st
+from datetime import datetime
+from database import db_connection
+from common import delete_user
+
+def confirm_delete_user_dialog(user_id, user_name):
+    st.warning(f"本当に従業員「{user_name}」さんを削除しますか？\n\nこの操作は元に戻せません。関連するすべての勤怠記録やシフト情報も削除されます。")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("はい、削除します", key=f"confirm_del_{user_id}", use_container_width=True, type="primary"):
+            if delete_user(user_id):
+                st.toast(f"「{user_name}」さんを削除しました。", icon="✅")
+            else:
+                st.error("削除中にエラーが発生しました。")
+            st.session_state.confirming_delete_user_id = None
+            st.rerun()
+    with col2:
+        if st.button("いいえ", key=f"cancel_del_{user_id}", use_container_width=True):
+            st.session_state.confirming_delete_user_id = None
+            st.rerun()
+
+def show_employee_information_page():
+    st.header("従業員情報")
+    st.info("あなたの会社の全従業員の情報を表示しています。")
+
+    if st.session_state.user_position not in ["社長", "役職者"]:
+        st.error("このページへのアクセス権限がありません。")
+        return
+
+    company_name = st.session_state.user_company
+    query = """
+    SELECT id, name, position, employee_id, created_at FROM users WHERE company = ?
+    ORDER BY CASE position WHEN '社長' THEN 1 WHEN '役職者' THEN 2 ELSE 3 END, id
+    """
+    try:
+        with db_connection() as conn:
+            all_users = conn.execute(query, (company_name,)).fetchall()
+
+        if not all_users:
+            st.warning("まだ従業員が登録されていません。")
+        else:
+            for user in all_users:
+                with st.container(border=True):
+                    st.write(f"**名前:** {user['name']}")
+                    st.write(f"**役職:** {user['position']}")
+                    st.write(f"**従業員ID:** {user['employee_id']}")
+                    st.write(f"**登録日時:** {datetime.fromisoformat(user['created_at']).strftime('%Y年%m月%d日 %H:%M')}")
+
+                    show_delete_button = True
+                    if user['id'] == st.session_state.user_id:
+                        show_delete_button = False
+                    if st.session_state.user_position == "役職者" and user['position'] == "社長":
+                        show_delete_button = False
+                    
+                    if show_delete_button:
+                        st.divider()
+                        if st.button("この従業員を削除", key=f"delete_{user['id']}", use_container_width=True, type="primary"):
+                            st.session_state.confirming_delete_user_id = user['id']
+                            st.rerun()
+                        if st.session_state.get('confirming_delete_user_id') == user['id']:
+                            confirm_delete_user_dialog(user['id'], user['name'])
+                
+                st.write("")
+
+    except Exception as e:
+        st.error(f"従業員情報の読み込み中にエラーが発生しました: {e}")
+        
@@ -0,0 +1,106 @@
+import streamlit as st
+import re
+import random
+from common import get_user, hash_password, register_user, validate_password
+
+TIPS = [
+    # --- 労働基準法の基本 (15個) ---
+    "労働契約は、口約束でも成立しますが、書面で条件を確認することが重要です。",
+    "1日の労働時間は原則8時間、1週間の労働時間は原則40時間と定められています。（法定労働時間）",
+    "6時間を超える勤務には、少なくとも45分の休憩が必要です。",
+    "8時間を超える勤務には、少なくとも1時間の休憩が必要です。",
+    "休憩時間は、労働時間の途中に、全従業員が一斉に取ることが原則です。",
+    "会社は、少なくとも週に1日、または4週間を通じて4日以上の休日を与えなければなりません。（法定休日）",
+    "法定休日に労働した場合、35%以上の割増賃金（休日手当）が必要です。",
+    "法定労働時間を超える労働（残業）には、25%以上の割増賃金が必要です。",
+    "午後10時から午前5時までの深夜労働には、さらに25%以上の割増賃金が加算されます。",
+    "有給休暇は、入社後6ヶ月間継続勤務し、全労働日の8割以上出勤した労働者に付与されます。",
+    "有給休暇をいつ使うかは、原則として労働者が自由に決めることができます。",
+    "会社は、業務上の理由で従業員に損害を与えた場合、安全配慮義務違反に問われることがあります。",
+    "会社を辞める際は、法律上は2週間前に申し出ることで退職できますが、就業規則の確認も必要です。",
+    "会社は、従業員を解雇する場合、原則として30日前に予告するか、30日分以上の平均賃金（解雇予告手当）を支払う必要があります。",
+    "業務上の怪我や病気で休業する場合、その期間とその後30日間は解雇することができません。",
+
+    # --- 社会保険・雇用 (15個) ---
+    "社会保険は、一般的に「健康保険」「厚生年金保険」「介護保険」「雇用保険」「労災保険」の5つを指します。",
+    "正社員でなくても、週の所定労働時間が20時間以上などの条件を満たせば社会保険の加入対象となります。",
+    "健康保険に加入していると、病気や怪我で医療機関にかかった際の医療費の自己負担が原則3割になります。",
+    "厚生年金保険は、老後の生活を支える「老齢年金」だけでなく、障害状態になった際の「障害年金」や、死亡した際の「遺族年金」も保障します。",
+    "40歳になると、自動的に介護保険に加入し、保険料の支払いが始まります。",
+    "雇用保険は、失業した際の生活を支える「基本手当（失業保険）」だけでなく、育児や介護で休業する際の給付金も含まれます。",
+    "業務中や通勤中の怪我は、労災保険の対象となり、治療費の自己負担はありません。",
+    "パートタイムやアルバイトでも、条件を満たせば雇用保険や社会保険への加入が義務付けられています。",
+    "会社を退職した後も、条件を満たせば元の会社の健康保険を「任意継続」することができます。",
+    "国民年金の保険料を支払うのが困難な場合、「免除」や「猶予」の制度を利用できることがあります。",
+    "「産前産後休業」や「育児休業」中は、申請により社会保険料が免除されます。",
+    "会社は、従業員の給与から所得税や住民税、社会保険料を天引き（源泉徴収）して、本人に代わって納付しています。",
+    "1年間の所得と税金を確定させる「年末調整」は、会社が行ってくれる簡易的な確定申告です。",
+    "扶養家族がいる場合、配偶者控除や扶養控除により、所得税や住民税が軽減されることがあります。",
+    "転職する際は、前の会社から「源泉徴収票」や「雇用保険被保険者証」などを受け取るのを忘れないようにしましょう。"
+]
+
+def show_login_register_page():
+    st.header("ログインまたは新規登録")
+    
+    menu = ["ログイン", "新規登録"]
+    choice = st.radio("メニューを選択", menu, horizontal=True)
+    
+    if choice == "ログイン":
+        with st.form("login_form"):
+            employee_id = st.text_input("従業員ID")
+            password = st.text_input("パスワード", type="password")
+            submitted = st.form_submit_button("ログイン")
+            if submitted:
+                # 半角数字のみを許可
+                if not re.match(r'^[0-9]+$', employee_id):
+                    st.error("従業員IDは半角数字で入力してください。")
+                else:
+                    user = get_user(employee_id)
+                    if user and user[3] == hash_password(password):
+                        st.session_state.logged_in = True
+                        st.session_state.user_id = user[0]
+                        st.session_state.user_name = user[1]
+                        st.session_state.user_company = user[5]
+                        st.session_state.user_position = user[6]
+                        st.session_state.daily_tip = random.choice(TIPS)
+                        st.rerun()
+                    else:
+                        st.error("従業員IDまたはパスワードが正しくありません。")
+                        
+    elif choice == "新規登録":
+        with st.form("register_form"):
+            new_name = st.text_input("名前")
+            new_company = st.text_input("会社名")
+            new_position = st.radio("役職", ("社長",), horizontal=True)
+            st.markdown("従業員IDは半角数字で設定してください。")
+            st.markdown("パスワードは、大文字、小文字、数字を含む8文字以上で設定してください。")
+            new_employee_id = st.text_input("従業員ID")
+            new_password = st.text_input("パスワード", type="password")
+            confirm_password = st.text_input("パスワード（確認用）", type="password")
+            submitted = st.form_submit_button("登録してログイン")
+            if submitted:
+                is_hankaku_numeric = re.match(r'^[0-9]+$', new_employee_id) is not None
+                
+                password_errors = validate_password(new_password)
+                if not (new_name and new_company and new_employee_id and new_password):
+                    st.warning("名前、会社名、従業員ID、パスワードは必須項目です。")
+                elif not is_hankaku_numeric:
+                    st.error("従業員IDは半角数字で入力してください。")
+                elif new_password != confirm_password:
+                    st.error("パスワードが一致しません。")
+                elif password_errors:
+                    st.error("パスワードは以下の要件を満たす必要があります：\n" + "\n".join(password_errors))
+                else:
+                    if register_user(new_name, new_employee_id, new_password, new_company, new_position):
+                        st.success("登録が完了しました。")
+                        user = get_user(new_employee_id)
+                        if user:
+                            st.session_state.logged_in = True
+                            st.session_state.user_id = user[0]
+                            st.session_state.user_name = user[1]
+                            st.session_state.user_company = user[5]
+                            st.session_state.user_position = user[6]
+                            st.session_state.daily_tip = random.choice(TIPS)
+                            st.rerun()
+                    else:
+                        st.error("その従業員IDは既に使用されています。")
@@ -0,0 +1,221 @@
+import streamlit as st
+from datetime import datetime
+import sqlite3
+from database import db_connection
+from common import get_jst_now, render_lazy_attachment, save_uploaded_file
+
+# 一斉送信は broadcasts に1行だけ保存し、送信時点で在籍している同じ会社の従業員全員に見える。
+# 既読は broadcast_reads に受信者ごとに記録する。
+VISIBLE_BROADCASTS_JOIN = "users u JOIN broadcasts b ON b.company = u.company AND b.created_at >= u.created_at"
+
+def add_broadcast_message(sender_id, content, company_name, attachment_id=None, file_name=None, file_type=None):
+    now = get_jst_now().isoformat()
+    try:
+        with db_connection() as conn:
+            conn.execute('INSERT INTO broadcasts (company, sender_id, content, created_at, attachment_id, file_name, file_type) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                         (company_name, sender_id, content, now, attachment_id, file_name, file_type))
+    except sqlite3.Error as e:
+        print(f"一斉送信メッセージの送信に失敗しました: {e}")
+
+# 全体メッセージ画面のフィード。システム通知と一斉送信を (created_at, kind, id) の降順で1本に並べ、
+# その組をカーソルにしたキーセット方式で古い方へ読み足す。
+MESSAGE_FEED_PAGE_SIZE = 20
+
+def feed_key(msg):
+    return (msg['created_at'], msg['kind'], msg['id'])
+
+def fetch_message_feed(user_id, before=None, since=None, limit=None):
+    system_conditions, broadcast_conditions, params = [], [], []
+    for key, range_op, key_op in ((before, '<=', '<'), (since, '>=', '>=')):
+        if key is not None:
+            # created_at だけの条件も併記して、各インデックスの範囲検索に使えるようにする
+            system_conditions.append(f"m.created_at {range_op} ? AND (m.created_at, 'SYSTEM', m.id) {key_op} (?, ?, ?)")
+            broadcast_conditions.append(f"b.created_at {range_op} ? AND (b.created_at, 'BROADCAST', b.id) {key_op} (?, ?, ?)")
+            params.append((key[0],) + tuple(key))
+    system_where = ''.join(f" AND {c}" for c in system_conditions)
+    broadcast_where = ''.join(f" AND {c}" for c in broadcast_conditions)
+    query = f"""
+        SELECT m.id AS id, m.content, m.created_at AS created_at, a.sha256, m.file_name, m.file_type, m.sender_id, 'SYSTEM' AS kind, m.is_read
+        FROM messages m LEFT JOIN attachments a ON a.id = m.attachment_id
+        WHERE m.user_id = ? AND m.message_type = 'SYSTEM'{system_where}
+        UNION ALL
+        SELECT b.id, b.content, b.created_at, a.sha256, b.file_name, b.file_type, b.sender_id, 'BROADCAST' AS kind,
+               EXISTS (SELECT 1 FROM broadcast_reads r WHERE r.broadcast_id = b.id AND r.user_id = u.id)
+        FROM {VISIBLE_BROADCASTS_JOIN} LEFT JOIN attachments a ON a.id = b.attachment_id
+        WHERE u.id = ?{broadcast_where}
+        ORDER BY created_at DESC, kind DESC, id DESC
+    """
+    query_params = [user_id] + [v for p in params for v in p] + [user_id] + [v for p in params for v in p]
+    if limit is not None:
+        query += " LIMIT ?"
+        query_params.append(limit)
+    with db_connection() as conn:
+        return conn.execute(query, query_params).fetchall()
+
+# 出退勤ログは自分の会社の分だけを (created_at, id) のキーセットで新しい順に読む
+ATTENDANCE_LOG_PAGE_SIZE = 50
+
+def fetch_attendance_log(company_name, before=None, since=None, limit=None):
+    conditions, params = "", [company_name]
+    if before is not None:
+        conditions += " AND created_at <= ? AND (created_at, id) < (?, ?)"
+        params += [before[0], before[0], before[1]]
+    if since is not None:
+        conditions += " AND created_at >= ? AND (created_at, id) >= (?, ?)"
+        params += [since[0], since[0], since[1]]
+    query = f"SELECT id, content, created_at FROM attendance_events WHERE company = ?{conditions} ORDER BY created_at DESC, id DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    with db_connection() as conn:
+        return conn.execute(query, params).fetchall()
+
+def mark_feed_read(user_id, messages):
+    # 表示したもののうち未読だったものだけを既読にする
+    now = get_jst_now().isoformat()
+    system_ids = [(msg['id'],) for msg in messages if msg['kind'] == 'SYSTEM' and not msg['is_read']]
+    broadcast_reads = [(msg['id'], user_id, now) for msg in messages if msg['kind'] == 'BROADCAST' and not msg['is_read']]
+    if not system_ids and not broadcast_reads:
+        return
+    with db_connection() as conn:
+        conn.executemany("UPDATE messages SET is_read = 1 WHERE id = ? AND is_read = 0", system_ids)
+        conn.executemany("INSERT OR IGNORE INTO broadcast_reads (broadcast_id, user_id, read_at) VALUES (?, ?, ?)", broadcast_reads)
+
+def delete_broadcast_message(broadcast_id):
+    try:
+        with db_connection() as conn:
+            conn.execute('DELETE FROM broadcasts WHERE id = ?', (broadcast_id,))
+    except sqlite3.Error as e:
+        st.error(f"メッセージの削除中にエラーが発生しました: {e}")
+
+@st.dialog("全体メッセージを送信")
+def broadcast_message_dialog():
+    st.subheader("全従業員へのメッセージ送信")
+    with st.form(key='broadcast_dialog_form'):
+        message_content = st.text_area("メッセージ内容を入力してください。", height=150)
+        uploaded_file = st.file_uploader("ファイルを添付 (任意)", type=None)
+
+        submitted = st.form_submit_button("この内容で送信する")
+        if submitted:
+            if message_content or uploaded_file:
+                sender_name = st.session_state.user_name
+                message_body = f"**【お知らせ】{sender_name}さんより**\n\n{message_content}"
+
+                attachment_id, file_name, file_type = None, None, None
+                if uploaded_file is not None:
+                    attachment_id = save_uploaded_file(uploaded_file)
+                    file_name = uploaded_file.name
+                    file_type = uploaded_file.type
+
+                add_broadcast_message(st.session_state.user_id, message_body, st.session_state.user_company, attachment_id, file_name, file_type)
+                st.toast("メッセージを送信しました！", icon="✅")
+                st.rerun()
+                
+            else:
+                st.warning("メッセージ内容を入力するか、ファイルを添付してください。")
+
+def show_messages_page():
+    if st.session_state.get('viewing_attendance_log'):
+        st.header("各従業員の出退勤状況")
+        if st.button("＜ 全体メッセージに戻る"):
+            st.session_state.viewing_attendance_log = False
+            st.rerun()
+        
+        st.info("全従業員の直近の出退勤記録です。")
+        st.divider()
+
+        company_name = st.session_state.user_company
+        cursor = st.session_state.attendance_log_cursor
+        if cursor is None:
+            logs = fetch_attendance_log(company_name, limit=ATTENDANCE_LOG_PAGE_SIZE + 1)
+            has_more = len(logs) > ATTENDANCE_LOG_PAGE_SIZE
+            logs = logs[:ATTENDANCE_LOG_PAGE_SIZE]
+        else:
+            logs = fetch_attendance_log(company_name, since=cursor)
+            has_more = bool(fetch_attendance_log(company_name, before=cursor, limit=1))
+
+        if not logs:
+            st.info("出退勤の記録はまだありません。")
+        else:
+            for log in logs:
+                created_at_dt = datetime.fromisoformat(log['created_at'])
+                st.markdown(f"**{created_at_dt.strftime('%Y年%m月%d日 %H:%M')}**<br>{log['content']}", unsafe_allow_html=True)
+                st.divider()
+
+            if has_more and st.button("もっと見る", key="attendance_log_more", use_container_width=True):
+                older = fetch_attendance_log(company_name, before=(logs[-1]['created_at'], logs[-1]['id']), limit=ATTENDANCE_LOG_PAGE_SIZE)
+                if older:
+                    st.session_state.attendance_log_cursor = (older[-1]['created_at'], older[-1]['id'])
+                st.rerun()
+
+    else:
+        st.header("全体メッセージ")
+
+        if st.button("各従業員の出退勤状況", use_container_width=True):
+            st.session_state.viewing_attendance_log = True
+            st.rerun()
+        
+        if st.button("📝 全社へメッセージを送信する", use_container_width=True, type="primary"):
+            st.session_state.show_broadcast_dialog = True
+            st.rerun()
+
+        if st.session_state.get('show_broadcast_dialog'):
+            st.session_state.show_broadcast_dialog = False
+            broadcast_message_dialog()
+
+        st.divider()
+
+        # 表示範囲は「最新N件」か「カーソルより新しいもの全部」。もっと見るでカーソルを古い方へ動かす
+        cursor = st.session_state.message_feed_cursor
+        if cursor is None:
+            messages = fetch_message_feed(st.session_state.user_id, limit=MESSAGE_FEED_PAGE_SIZE + 1)
+            has_more = len(messages) > MESSAGE_FEED_PAGE_SIZE
+            messages = messages[:MESSAGE_FEED_PAGE_SIZE]
+        else:
+            messages = fetch_message_feed(st.session_state.user_id, since=cursor)
+            has_more = bool(fetch_message_feed(st.session_state.user_id, before=cursor, limit=1))
+
+        if not messages:
+            st.info("新しいメッセージはありません。")
+        else:
+            for msg in messages:
+                with st.container(border=True):
+                    created_at_str = msg[2]
+                    is_broadcast = msg[7] == 'BROADCAST'
+                    is_confirming_this_message = is_broadcast and st.session_state.get('confirming_delete_broadcast_id') == msg[0]
+                    if is_confirming_this_message:
+                        st.warning("このメッセージを全ユーザーから削除します。よろしいですか？")
+                        c1, c2 = st.columns(2)
+                        with c1:
+                            if st.button("はい、削除します", key=f"confirm_delete_broadcast_{msg[0]}", type="primary", use_container_width=True):
+                                delete_broadcast_message(msg[0])
+                                st.session_state.confirming_delete_broadcast_id = None
+                                st.toast("メッセージを削除しました。")
+                                st.rerun()
+                        with c2:
+                            if st.button("いいえ", key=f"cancel_delete_broadcast_{msg[0]}", use_container_width=True):
+                                st.session_state.confirming_delete_broadcast_id = None
+                                st.rerun()
+                    else:
+                        msg_col1, msg_col2 = st.columns([4, 1])
+                        with msg_col1:
+                            unread_mark = "🆕 " if not msg['is_read'] else ""
+                            st.markdown(f"{unread_mark}**{datetime.fromisoformat(created_at_str).strftime('%Y年%m月%d日 %H:%M')}**")
+                        with msg_col2:
+                            if is_broadcast and msg[6] == st.session_state.user_id:
+                                if st.button("🗑️ 削除", key=f"delete_broadcast_{msg[0]}", use_container_width=True):
+                                    st.session_state.confirming_delete_broadcast_id = msg[0]
+                                    st.rerun()
+                        if msg[1]: st.markdown(msg[1])
+                        if msg[3]:
+                            file_name = msg[4] or "downloaded_file"
+                            render_lazy_attachment(f"{msg[7]}_{msg[0]}", msg[3], file_name, msg[5], f"📎 ダウンロード: {file_name}")
+
+            if has_more and st.button("もっと見る", use_container_width=True):
+                older = fetch_message_feed(st.session_state.user_id, before=feed_key(messages[-1]), limit=MESSAGE_FEED_PAGE_SIZE)
+                if older:
+                    st.session_state.message_feed_cursor = feed_key(older[-1])
+                st.rerun()
+
+        mark_feed_read(st.session_state.user_id, messages)
+            
@@ -0,0 +1,54 @@
+import streamlit as st
+import time as py_time
+from common import register_user, validate_password
+import user_import
+
+def show_user_registration_page():
+    st.header("ユーザー登録")
+    st.info("あなたの会社に新しいユーザーを登録します。")
+
+    with st.form("user_registration_form"):
+        st.text_input("会社名", value=st.session_state.user_company, disabled=True)
+
+        new_name = st.text_input("名前")
+        new_position = st.radio("役職", ("役職者", "社員", "バイト"), horizontal=True)
+        new_employee_id = st.text_input("従業員ID")
+
+        st.markdown("---")
+        st.markdown("パスワードは、大文字、小文字、数字を含む8文字以上で設定してください。")
+        new_password = st.text_input("初期パスワード", type="password")
+        confirm_password = st.text_input("初期パスワード（確認用）", type="password")
+
+        submitted = st.form_submit_button("この内容で登録する")
+
+        if submitted:
+            password_errors = validate_password(new_password)
+            if not (new_name and new_employee_id and new_password):
+                st.warning("名前、従業員ID、パスワードは必須項目です。")
+            elif not new_employee_id.isdigit():
+                st.error("従業員IDは数字で入力してください。")
+            elif new_password != confirm_password:
+                st.error("パスワードが一致しません。")
+            elif password_errors:
+                error_message = "パスワードは以下の要件を満たす必要があります：\n" + "\n".join(password_errors)
+                st.error(error_message)
+            else:
+                company_name_from_session = st.session_state.user_company
+                if register_user(new_name, new_employee_id, new_password, company_name_from_session, new_position):
+                    st.success(f"ユーザー「{new_name}」さんを登録しました。")
+                    py_time.sleep(2)
+                    st.rerun()
+                else:
+                    st.error("その従業員IDは既に使用されています。")
+
+    with st.expander("📥 CSV / Excelで一括登録"):
+        st.caption("1行目に「名前, 従業員ID, 役職, 初期パスワード」の見出しを付けてください。役職は 役職者・社員・バイト のいずれかです。"
+                   "エラーのある行は登録せず、理由を表示します（ほかの行は登録されます）。")
+        uploaded_file = st.file_uploader("ファイルを選択", type=['csv', 'xlsx'], key="user_import_file")
+        if uploaded_file is not None and st.button("一括登録する", type="primary"):
+            with st.spinner("登録しています..."):
+                registered, errors = user_import.import_users(uploaded_file, st.session_state.user_company)
+            if registered:
+                st.success(f"{len(registered)}人のユーザーを登録しました。")
+            if errors:
+                st.error(f"{len(errors)}行は登録できませんでした。\n\n" + "\n".join(f"- {line}行目: {message}" for line, message in errors))
@@ -0,0 +1,262 @@
+import streamlit as st
+from datetime import datetime, date, time, timedelta
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from streamlit_calendar import calendar
+from dateutil.relativedelta import relativedelta
+from database import db_connection
+import work_summary
+import shift_templates
+from common import JST, get_user_shift_version, shift_row_values
+
+# 月ごとのカレンダーイベントをプロセス内で共有する。キーは (ユーザー, 月初日, その従業員のシフトのデータバージョン) で、
+# シフトが変わればバージョンが上がるので古いイベントは参照されなくなり、いずれ追い出される。
+MONTH_EVENTS_CACHE_SIZE = 256
+_month_events_lock = threading.Lock()
+_month_events = OrderedDict()
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='shift-prefetch')
+
+def calendar_window(first_day):
+    # dayGridMonth は月初を含む週の日曜日から6週間を表示する。前日開始の夜勤も見えるよう1日余分に読む
+    grid_start = first_day - timedelta(days=(first_day.weekday() + 1) % 7)
+    return grid_start - timedelta(days=1), grid_start + timedelta(days=41)
+
+def load_month_events(user_id, first_day):
+    window_start, window_end = calendar_window(first_day)
+    with db_connection() as conn:
+        shifts = conn.execute('SELECT id, start_datetime, end_datetime FROM shifts WHERE user_id = ? AND work_date BETWEEN ? AND ?',
+                              (user_id, window_start.isoformat(), window_end.isoformat())).fetchall()
+
+    events = []
+    for shift in shifts:
+        start_dt = datetime.fromisoformat(shift['start_datetime'])
+        end_dt = datetime.fromisoformat(shift['end_datetime'])
+        title = f"{start_dt.strftime('%H:%M')}~{end_dt.strftime('%H:%M')}"
+        if start_dt.time() >= time(22, 0) or end_dt.time() <= time(5, 0):
+            title += " (夜)"
+        color = "#FF6347" if (start_dt.time() >= time(22, 0) or end_dt.time() <= time(5, 0)) else "#1E90FF"
+        events.append({
+            "title": title, "start": start_dt.isoformat(), "end": end_dt.isoformat(),
+            "color": color, "id": shift['id'], "allDay": False
+        })
+    return events
+
+def get_month_events(user_id, first_day, version):
+    key = (user_id, first_day, version)
+    with _month_events_lock:
+        if key in _month_events:
+            _month_events.move_to_end(key)
+            return _month_events[key]
+    events = load_month_events(user_id, first_day)
+    with _month_events_lock:
+        _month_events[key] = events
+        while len(_month_events) > MONTH_EVENTS_CACHE_SIZE:
+            _month_events.popitem(last=False)
+    return events
+
+def prefetch_month_events(user_id, first_day, version):
+    with _month_events_lock:
+        if (user_id, first_day, version) in _month_events:
+            return
+    _prefetch_executor.submit(get_month_events, user_id, first_day, version)
+
+@st.dialog("シフト登録・編集")
+def shift_edit_dialog(target_date):
+    pass
+
+def render_shift_edit_form(target_date):
+    with st.container(border=True):
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.subheader(f"🗓️ {target_date.strftime('%Y年%m月%d日')} のシフト登録・編集")
+        with col2:
+            if st.button("✖️ 閉じる", help="フォームを閉じてカレンダーに戻ります"):
+                st.session_state.editing_date = None
+                st.rerun()
+
+        with db_connection() as conn:
+            existing_shift = conn.execute(
+                "SELECT id, start_datetime, end_datetime FROM shifts WHERE user_id = ? AND work_date = ?",
+                (st.session_state.user_id, target_date.isoformat())
+            ).fetchone()
+
+        if existing_shift:
+            default_start = datetime.fromisoformat(existing_shift['start_datetime'])
+            default_end = datetime.fromisoformat(existing_shift['end_datetime'])
+        else:
+            is_overnight = st.session_state.last_shift_start_time > st.session_state.last_shift_end_time
+            default_end_date = target_date + timedelta(days=1) if is_overnight else target_date
+            default_start = datetime.combine(target_date, st.session_state.last_shift_start_time)
+            default_end = datetime.combine(default_end_date, st.session_state.last_shift_end_time)
+
+        with st.form(key=f"shift_form_{target_date}"):
+            c1, c2 = st.columns(2)
+            with c1:
+                start_date_input = st.date_input("出勤日", value=default_start.date())
+                end_date_input = st.date_input("退勤日", value=default_end.date())
+            with c2:
+                start_time_input = st.time_input("出勤時刻", value=default_start.time())
+                end_time_input = st.time_input("退勤時刻", value=default_end.time())
+
+            start_datetime = datetime.combine(start_date_input, start_time_input)
+            end_datetime = datetime.combine(end_date_input, end_time_input)
+
+            btn_col1, btn_col2, _ = st.columns([1, 1, 3])
+            with btn_col1:
+                save_button = st.form_submit_button("登録・更新", use_container_width=True, type="primary")
+            with btn_col2:
+                delete_button = st.form_submit_button("削除", use_container_width=True)
+
+        if save_button:
+            if start_datetime >= end_datetime:
+                st.error("出勤日時は退勤日時より前に設定してください。")
+            else:
+                shift_values = shift_row_values(start_datetime, end_datetime)
+                with db_connection() as conn:
+                    if existing_shift:
+                        conn.execute('UPDATE shifts SET start_datetime = ?, end_datetime = ?, work_date = ?, start_epoch = ?, end_epoch = ? WHERE id = ?',
+                                     shift_values + (existing_shift['id'],))
+                    else:
+                        conn.execute('INSERT INTO shifts (user_id, start_datetime, end_datetime, work_date, start_epoch, end_epoch) VALUES (?, ?, ?, ?, ?, ?)',
+                                     (st.session_state.user_id,) + shift_values)
+                    # 残業時間はシフトの終了時刻に依存するため、既に勤怠のある日は集計を更新する
+                    work_summary.refresh_day(conn, st.session_state.user_id, target_date.isoformat())
+                    if shift_values[2] != target_date.isoformat():
+                        work_summary.refresh_day(conn, st.session_state.user_id, shift_values[2])
+                st.session_state.last_shift_start_time = start_datetime.time()
+                st.session_state.last_shift_end_time = end_datetime.time()
+                st.toast("シフトを保存しました！", icon="✅")
+                st.session_state.editing_date = None
+                st.rerun()
+
+        if delete_button:
+            if existing_shift:
+                with db_connection() as conn:
+                    conn.execute('DELETE FROM shifts WHERE id = ?', (existing_shift['id'],))
+                    work_summary.refresh_day(conn, st.session_state.user_id, target_date.isoformat())
+                st.toast("シフトを削除しました。", icon="🗑️")
+                st.session_state.editing_date = None
+                st.rerun()
+                
+            else:
+                st.warning("削除するシフトが登録されていません。")
+                
+GENERATE_POLICIES = {"登録済みの日はそのまま": shift_templates.SKIP_EXISTING, "登録済みの日も上書きする": shift_templates.OVERWRITE_EXISTING}
+
+def render_shift_templates(first_day):
+    with st.expander("🔁 定型シフトから作成"):
+        templates = shift_templates.get_templates(st.session_state.user_id)
+        if templates:
+            template_labels = {t['id']: shift_templates.describe_template(t) for t in templates}
+            with st.form("generate_shifts_form"):
+                template_id = st.selectbox("定型シフト", list(template_labels), format_func=template_labels.get)
+                last_day = (first_day + relativedelta(months=1)) - timedelta(days=1)
+                period = st.date_input("期間", value=(first_day, last_day))
+                policy_label = st.radio("登録済みの日", list(GENERATE_POLICIES), horizontal=True, label_visibility="collapsed")
+                col1, col2, _ = st.columns([1, 1, 2])
+                with col1:
+                    generate_button = st.form_submit_button("シフトを作成", type="primary", use_container_width=True)
+                with col2:
+                    delete_button = st.form_submit_button("この定型を削除", use_container_width=True)
+            if generate_button:
+                if len(period) != 2:
+                    st.error("期間の開始日と終了日を選んでください。")
+                else:
+                    inserted, updated, skipped = shift_templates.generate_shifts(
+                        st.session_state.user_id, template_id, period[0], period[1], GENERATE_POLICIES[policy_label])
+                    st.toast(f"シフトを作成しました（追加 {inserted}件、上書き {updated}件、そのまま {skipped}件）。", icon="✅")
+                    st.rerun()
+            if delete_button:
+                shift_templates.delete_template(st.session_state.user_id, template_id)
+                st.rerun()
+            st.caption("過去の日付のシフトは作成・変更されません。")
+
+        st.markdown("**定型シフトを追加**")
+        with st.form("shift_template_form", clear_on_submit=True):
+            name = st.text_input("名前", placeholder="例: 平日日勤")
+            weekdays = st.multiselect("曜日", range(7), format_func=lambda d: shift_templates.WEEKDAY_JP[d])
+            c1, c2, c3 = st.columns([2, 2, 1])
+            with c1:
+                start_time = st.time_input("開始時刻", value=st.session_state.last_shift_start_time)
+            with c2:
+                end_time = st.time_input("終了時刻", value=st.session_state.last_shift_end_time)
+            with c3:
+                overnight = st.checkbox("翌日まで", value=st.session_state.last_shift_start_time > st.session_state.last_shift_end_time)
+            if st.form_submit_button("追加"):
+                error = shift_templates.save_template(st.session_state.user_id, name, weekdays, start_time, end_time, overnight)
+                if error:
+                    st.error(error)
+                else:
+                    st.rerun()
+
+def show_shift_management_page():
+    st.header("シフト管理")
+
+    if st.session_state.get('editing_date'):
+        render_shift_edit_form(st.session_state.editing_date)
+        return
+
+    st.info("カレンダーの日付または登録済みのシフトをクリックして編集フォームを開きます。")
+
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.subheader(st.session_state.calendar_date.strftime('%Y年 %m月'), anchor=False, divider='blue')
+    with col2:
+        btn_col1, btn_col2 = st.columns(2)
+        with btn_col1:
+            if st.button("先月", use_container_width=True):
+                st.session_state.calendar_date -= relativedelta(months=1)
+                st.rerun()
+        with btn_col2:
+            if st.button("来月", use_container_width=True):
+                st.session_state.calendar_date += relativedelta(months=1)
+                st.rerun()
+
+    first_day = st.session_state.calendar_date.replace(day=1)
+    render_shift_templates(first_day)
+    version = get_user_shift_version(st.session_state.user_id)
+    events = get_month_events(st.session_state.user_id, first_day, version)
+    # 先月・来月へ移動した時にすぐ表示できるよう、前後の月をバックグラウンドで読み込んでおく
+    for adjacent_month in (first_day - relativedelta(months=1), first_day + relativedelta(months=1)):
+        prefetch_month_events(st.session_state.user_id, adjacent_month, version)
+
+    st.markdown("""
+        <style>
+        .fc-view-harness {
+            min-height: 700px !important;
+        }
+        </style>
+    """, unsafe_allow_html=True)
+
+    calendar_result = calendar(
+        events=events,
+        options={
+            "headerToolbar": False,
+            "initialDate": st.session_state.calendar_date.isoformat(),
+            "initialView": "dayGridMonth",
+            "locale": "ja",
+            "selectable": True,
+            "height": "auto" ,
+            "displayEventTime": False,
+        },
+        custom_css=".fc-event-title { font-weight: 700; }",
+        key=f"calendar_{st.session_state.calendar_date.year}_{st.session_state.calendar_date.month}"
+    )
+
+    if isinstance(calendar_result, dict):
+        clicked_date = None
+        if 'dateClick' in calendar_result:
+            utc_dt = datetime.fromisoformat(calendar_result['dateClick']['date'].replace('Z', '+00:00'))
+            clicked_date = utc_dt.astimezone(JST).date()
+        elif 'eventClick' in calendar_result:
+            start_str = calendar_result['eventClick']['event']['start'].split('T')[0]
+            clicked_date = date.fromisoformat(start_str)
+        
+        if clicked_date:
+            if clicked_date < date.today():
+                st.warning("過去の日付のシフトは変更できません。")
+            else:
+                st.session_state.editing_date = clicked_date
+                st.rerun()
+                
@@ -0,0 +1,171 @@
+import streamlit as st
+import pandas as pd
+import calendar as py_calendar
+from dateutil.relativedelta import relativedelta
+from database import db_connection
+from common import get_shift_data_version
+import shift_import
+
+POSITION_ICONS = {"社長": "👑", "役職者": "🥈", "社員": "🥉", "バイト": "👦🏿"}
+WEEKDAY_JP = ['月', '火', '水', '木', '金', '土', '日']
+FILTER_COLUMNS = ['_id', '_position', '_name']
+PAGE_SIZE_OPTIONS = (50, 100, 200)
+IMPORT_ERROR_DISPLAY_LIMIT = 200
+
+# 月間シフト表は (会社, 月, データバージョン) ごとにキャッシュする。バージョンはシフトや従業員が
+# 変わるたびにトリガーで増えるため（shift_table_versions）、古い表が返ることはない。
+@st.cache_data(max_entries=64, show_spinner=False)
+def build_shift_table(company_name, first_day, version):
+    last_day = first_day.replace(day=py_calendar.monthrange(first_day.year, first_day.month)[1])
+    users_query = "SELECT id, name, position FROM users WHERE company = ? ORDER BY CASE position WHEN '社長' THEN 1 WHEN '役職者' THEN 2 ELSE 3 END, id"
+    shifts_query = """
+        SELECT s.user_id, s.start_datetime, s.end_datetime FROM users u JOIN shifts s ON s.user_id = u.id
+        WHERE u.company = ? AND s.work_date BETWEEN ? AND ?
+        ORDER BY s.id
+    """
+    with db_connection() as conn:
+        users = pd.read_sql_query(users_query, conn, params=(company_name,))
+        if users.empty:
+            return pd.DataFrame()
+        shifts = pd.read_sql_query(shifts_query, conn, params=(company_name, first_day.isoformat(), last_day.isoformat()))
+
+    day_columns = [f"{d.strftime('%d')} ({WEEKDAY_JP[d.weekday()]})" for d in pd.date_range(start=first_day, end=last_day)]
+
+    # 各シフトの表示文字列を列単位でまとめて作り、(従業員, 日) の表に1回でピボットする
+    start = pd.to_datetime(shifts['start_datetime'], format='ISO8601')
+    end = pd.to_datetime(shifts['end_datetime'], format='ISO8601')
+    end_text = end.dt.strftime('%H:%M').where(start.dt.normalize() == end.dt.normalize(), end.dt.strftime('%m/%d %H:%M'))
+    shifts['day'] = start.dt.day.map(lambda day: day_columns[day - 1])
+    shifts['text'] = start.dt.strftime('%H:%M') + '～' + end_text
+    grid = (shifts.drop_duplicates(['user_id', 'day'], keep='last')
+                  .pivot(index='user_id', columns='day', values='text')
+                  .reindex(index=users['id'], columns=day_columns)
+                  .fillna(''))
+
+    grid.insert(0, '従業員名', (users['position'].map(POSITION_ICONS).fillna('') + ' ' + users['name']).values)
+    grid = grid.reset_index(drop=True)
+    # 絞り込み用の列（表示時に落とす）
+    grid['_id'] = users['id'].values
+    grid['_position'] = users['position'].values
+    grid['_name'] = users['name'].values
+    return grid
+
+def reset_shift_table_page():
+    st.session_state.shift_table_page = 1
+
+def render_shift_import():
+    with st.expander("📥 シフトを一括取り込み（CSV / Excel）"):
+        st.caption("1行目に「従業員ID, 日付, 開始時刻, 終了時刻」の見出しを付けてください（例: 1001, 2025-04-01, 09:00, 18:00）。"
+                   "終了時刻が開始時刻より前の行は翌日までの夜勤として扱い、同じ従業員・日付の登録済みシフトは上書きします。")
+        uploaded_file = st.file_uploader("ファイルを選択", type=['csv', 'xlsx'], key="shift_import_file")
+        if uploaded_file is not None and st.button("取り込み内容を確認（まだ保存されません）"):
+            st.session_state.shift_import_plan = shift_import.plan_shift_import(uploaded_file, st.session_state.user_company)
+
+        plan = st.session_state.shift_import_plan
+        if plan is None:
+            return
+
+        st.write(f"追加 {len(plan['inserts'])}件 ／ 変更 {len(plan['updates'])}件 ／ 変更なし {plan['unchanged']}件 ／ エラー {len(plan['errors'])}件")
+        if plan['errors']:
+            error_lines = [f"{line}行目: {message}" for line, message in plan['errors'][:IMPORT_ERROR_DISPLAY_LIMIT]]
+            if len(plan['errors']) > IMPORT_ERROR_DISPLAY_LIMIT:
+                error_lines.append(f"ほか {len(plan['errors']) - IMPORT_ERROR_DISPLAY_LIMIT}件")
+            st.error("エラーの行は取り込まれません。\n\n" + "\n".join(f"- {line}" for line in error_lines))
+        if plan['preview']:
+            st.dataframe(plan['preview'], use_container_width=True, hide_index=True)
+
+        col1, col2, _ = st.columns([1, 1, 3])
+        with col1:
+            if st.button("取り込む", type="primary", use_container_width=True, disabled=not plan['preview']):
+                inserted, updated, conflicted = shift_import.apply_shift_import(plan)
+                st.session_state.shift_import_plan = None
+                st.toast(f"シフトを取り込みました（追加 {inserted}件、変更 {updated}件）。")
+                if conflicted:
+                    st.toast(f"{conflicted}件は確認後に別の画面でシフトが変更されていたため、取り込みませんでした。もう一度確認してください。", icon="⚠️")
+                st.rerun()
+        with col2:
+            if st.button("やめる", use_container_width=True):
+                st.session_state.shift_import_plan = None
+                st.rerun()
+
+def show_shift_table_page():
+    st.header("月間シフト表")
+    col1, col2, col3 = st.columns([1, 6, 1])
+    with col1:
+        if st.button("先月", key="table_prev"):
+            st.session_state.calendar_date -= relativedelta(months=1)
+            st.rerun()
+    with col2:
+        st.subheader(st.session_state.calendar_date.strftime('%Y年 %m月'), anchor=False, divider='blue')
+    with col3:
+        if st.button("来月", key="table_next"):
+            st.session_state.calendar_date += relativedelta(months=1)
+            st.rerun()
+
+    first_day = st.session_state.calendar_date.replace(day=1)
+
+    if st.session_state.user_position in ["社長", "役職者"]:
+        render_shift_import()
+
+    company_name = st.session_state.user_company
+    df = build_shift_table(company_name, first_day, get_shift_data_version(company_name))
+
+    if df.empty:
+        st.info("あなたの会社には、まだ従業員が登録されていません。")
+        return
+
+    # 大人数の会社でも表示する行だけをブラウザに送る（絞り込み → ページ分割 → 表示列のみ）
+    filter_col1, filter_col2, filter_col3 = st.columns([2, 3, 1])
+    with filter_col1:
+        selected_positions = st.multiselect("役職で絞り込み", list(POSITION_ICONS), key="shift_table_positions", on_change=reset_shift_table_page)
+    with filter_col2:
+        name_query = st.text_input("名前で検索", key="shift_table_name_query", on_change=reset_shift_table_page)
+    with filter_col3:
+        page_size = st.selectbox("表示件数", PAGE_SIZE_OPTIONS, key="shift_table_page_size", on_change=reset_shift_table_page)
+
+    mask = pd.Series(True, index=df.index)
+    if selected_positions:
+        mask &= df['_position'].isin(selected_positions)
+    if name_query:
+        mask &= df['_name'].str.contains(name_query, case=False, regex=False)
+    filtered = df[mask]
+    if filtered.empty:
+        st.info("条件に一致する従業員がいません。")
+        return
+
+    page_count = (len(filtered) - 1) // page_size + 1
+    page = min(st.session_state.shift_table_page, page_count)
+    window = filtered.iloc[(page - 1) * page_size:page * page_size]
+
+    # 自分の行は名前に印を付けて示す（Stylerを通さず、Arrowのまま送れる素のDataFrameにする）
+    display_names = window['従業員名'].where(window['_id'] != st.session_state.user_id, '⭐ ' + window['従業員名'])
+    window = window.drop(columns=FILTER_COLUMNS)
+    window['従業員名'] = display_names
+
+    column_config = {
+        "従業員名": st.column_config.Column(width="medium")
+    }
+
+    for col in window.columns:
+        if col != "従業員名":
+            column_config[col] = st.column_config.Column(width="medium")
+    
+    st.dataframe(
+        window,
+        use_container_width=True,
+        hide_index=True,
+        column_config=column_config
+    )
+
+    if page_count > 1:
+        page_col1, page_col2, page_col3 = st.columns([1, 6, 1])
+        with page_col1:
+            if st.button("前へ", key="table_page_prev", disabled=page <= 1):
+                st.session_state.shift_table_page = page - 1
+                st.rerun()
+        with page_col2:
+            st.caption(f"{page} / {page_count} ページ（{len(filtered)}人中 {(page - 1) * page_size + 1}～{(page - 1) * page_size + len(window)}人目）")
+        with page_col3:
+            if st.button("次へ", key="table_page_next", disabled=page >= page_count):
+                st.session_state.shift_table_page = page + 1
+                st.rerun()
@@ -0,0 +1,296 @@
+import streamlit as st
+from datetime import datetime, timedelta
+import time as py_time
+from database import db_connection
+import attendance_cache
+import work_summary
+from common import JST, add_attendance_log, add_message, apply_attendance_state, get_jst_now, invalidate_timecard_snapshot, load_attendance_state, set_attendance_state
+
+def show_timecard_page():
+    st.title(f"ようこそ、{st.session_state.user_name}さん")
+    render_live_clock()
+
+    action_map = {
+        'clock_in': {'message': '出勤しますか？', 'func': record_clock_in},
+        'clock_out': {'message': '退勤しますか？', 'func': record_clock_out},
+        'break_start': {'message': '休憩を開始しますか？', 'func': record_break_start},
+        'break_end': {'message': '休憩を終了しますか？', 'func': record_break_end},
+        'cancel_clock_in': {'message': '本当に出勤を取り消しますか？\n\nこの操作は元に戻せません。', 'func': record_clock_in_cancellation}
+    }
+
+    button_placeholder = st.empty()
+    with button_placeholder.container():
+        if st.session_state.get('clock_in_error'):
+            st.warning(st.session_state.clock_in_error)
+
+        if st.session_state.get('confirmation_action'):
+            action_details = action_map.get(st.session_state.confirmation_action)
+            if action_details:
+                st.warning(action_details['message'])
+                col1, col2 = st.columns(2)
+                with col1:
+                    if st.button("はい", use_container_width=True, type="primary"):
+                        action_details['func']()
+                        st.session_state.confirmation_action = None
+                        st.session_state.clock_in_error = None
+                        st.rerun()
+                with col2:
+                    if st.button("いいえ", use_container_width=True):
+                        st.session_state.confirmation_action = None
+                        st.rerun()
+        else:
+            if st.session_state.work_status == "not_started":
+                if st.button("出勤", key="clock_in", use_container_width=True):
+                    today_str = get_jst_now().date().isoformat()
+                    query = "SELECT start_datetime FROM shifts WHERE user_id = ? AND work_date = ?"
+                    with db_connection() as conn:
+                        shift = conn.execute(query, (st.session_state.user_id, today_str)).fetchone()
+                    
+                    error_msg = None
+                    if shift is None:
+                        error_msg = "本日のシフトが登録されていません。先にシフトを登録してください。"
+                    else:
+                        naive_start_dt = datetime.fromisoformat(shift[0])
+                        start_dt = naive_start_dt.replace(tzinfo=JST)
+                        earliest_clock_in = start_dt - timedelta(minutes=5)
+                        now = get_jst_now()
+                        if now < earliest_clock_in:
+                            error_msg = f"出勤できません。出勤時刻の5分前（{earliest_clock_in.strftime('%H:%M')}）から打刻できます。"
+                    
+                    if error_msg:
+                        st.session_state.clock_in_error = error_msg
+                    else:
+                        st.session_state.clock_in_error = None
+                        st.session_state.confirmation_action = 'clock_in'
+                    st.rerun()
+            
+            elif st.session_state.work_status == "working":
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    if st.button("退勤", key="clock_out", use_container_width=True, type="primary"):
+                        st.session_state.confirmation_action = 'clock_out'
+                        st.rerun()
+                with col2:
+                    if st.button("休憩開始", key="break_start", use_container_width=True):
+                        st.session_state.confirmation_action = 'break_start'
+                        st.rerun()
+                with col3:
+                    if st.button("出勤取り消し", key="cancel_clock_in", use_container_width=True):
+                        st.session_state.confirmation_action = 'cancel_clock_in'
+                        st.rerun()
+            elif st.session_state.work_status == "on_break":
+                if st.button("休憩終了", key="break_end", use_container_width=True):
+                    st.session_state.confirmation_action = 'break_end'
+                    st.rerun()
+    
+    display_work_summary()
+    
+def record_clock_in():
+    now = get_jst_now()
+    with db_connection() as conn:
+        cursor = conn.execute('INSERT INTO attendance (user_id, work_date, clock_in) VALUES (?, ?, ?) ON CONFLICT (user_id, work_date) DO NOTHING',
+                              (st.session_state.user_id, now.date().isoformat(), now.isoformat()))
+    if cursor.rowcount == 0:
+        # 別のタブなどで既に今日の出勤が記録されている。その状態を読み直して表示に反映する
+        state = load_attendance_state(st.session_state.user_id, now.date().isoformat())
+        attendance_cache.put_state(st.session_state.user_id, state)
+        apply_attendance_state(state)
+        invalidate_timecard_snapshot()
+        return
+    set_attendance_state(cursor.lastrowid, "working")
+    log_content = f"✅ {st.session_state.user_name}さん、出勤しました。（{now.strftime('%H:%M')}）"
+    add_attendance_log(st.session_state.user_id, 'clock_in', log_content)
+
+def record_clock_out():
+    now = get_jst_now()
+    with db_connection() as conn:
+        conn.execute('UPDATE attendance SET clock_out = ? WHERE id = ?', (now.isoformat(), st.session_state.attendance_id))
+        att = conn.execute('SELECT clock_in FROM attendance WHERE id = ?', (st.session_state.attendance_id,)).fetchone()
+        breaks = conn.execute('SELECT break_start, break_end FROM breaks WHERE attendance_id = ?', (st.session_state.attendance_id,)).fetchall()
+        work_summary.refresh_attendance(conn, st.session_state.attendance_id)
+    if att:
+        clock_in_time = datetime.fromisoformat(att['clock_in'])
+        total_work_seconds = (now - clock_in_time).total_seconds()
+        total_break_seconds = 0
+        for br in breaks:
+            if br['break_start'] and br['break_end']:
+                total_break_seconds += (datetime.fromisoformat(br['break_end']) - datetime.fromisoformat(br['break_start'])).total_seconds()
+
+        log_content = f"🌙 {st.session_state.user_name}さん、退勤しました。（{now.strftime('%H:%M')}）"
+        add_attendance_log(st.session_state.user_id, 'clock_out', log_content)
+
+        if total_work_seconds > 8 * 3600 and total_break_seconds < 60 * 60:
+            add_message(st.session_state.user_id, "⚠️ **警告:** 8時間以上の勤務に対し、休憩が60分未満です。")
+        elif total_work_seconds > 6 * 3600 and total_break_seconds < 45 * 60:
+            add_message(st.session_state.user_id, "⚠️ **警告:** 6時間以上の勤務に対し、休憩が45分未満です。")
+    set_attendance_state(st.session_state.attendance_id, "finished")
+
+def record_break_start():
+    now = get_jst_now()
+    with db_connection() as conn:
+        cursor = conn.execute('INSERT INTO breaks (attendance_id, break_start) VALUES (?, ?)', (st.session_state.attendance_id, now.isoformat()))
+    set_attendance_state(st.session_state.attendance_id, "on_break", cursor.lastrowid)
+
+def record_break_end():
+    now = get_jst_now()
+    with db_connection() as conn:
+        conn.execute('UPDATE breaks SET break_end = ? WHERE id = ?', (now.isoformat(), st.session_state.break_id))
+        work_summary.refresh_attendance(conn, st.session_state.attendance_id)
+    set_attendance_state(st.session_state.attendance_id, "working")
+
+def record_clock_in_cancellation():
+    if st.session_state.attendance_id:
+        with db_connection() as conn:
+            att = conn.execute('SELECT user_id, work_date FROM attendance WHERE id = ?', (st.session_state.attendance_id,)).fetchone()
+            conn.execute('DELETE FROM breaks WHERE attendance_id = ?', (st.session_state.attendance_id,))
+            conn.execute('DELETE FROM attendance WHERE id = ?', (st.session_state.attendance_id,))
+            if att is not None:
+                work_summary.refresh_day(conn, att['user_id'], att['work_date'])
+        add_message(st.session_state.user_id, f"🗑️ 出勤記録を取り消しました。")
+        set_attendance_state(None, "not_started")
+
+# 時計と勤務時間の表示はフラグメントとして毎秒そこだけ再実行する（アプリ全体は再実行しない）。
+# 勤怠・休憩・シフトはスナップショットとしてセッションに保持し、打刻時か状態が変わった時だけDBから読み直す。
+@st.fragment(run_every=1)
+def render_live_clock():
+    st.header(get_jst_now().strftime("%Y-%m-%d %H:%M:%S"))
+
+def get_timecard_snapshot():
+    today_str = get_jst_now().date().isoformat()
+    key = (st.session_state.attendance_id, st.session_state.work_status, today_str)
+    snapshot = st.session_state.get('timecard_snapshot')
+    if snapshot is None or snapshot['key'] != key:
+        with db_connection() as conn:
+            att = conn.execute('SELECT clock_in, clock_out FROM attendance WHERE id = ?', (st.session_state.attendance_id,)).fetchone()
+            breaks, shift = [], None
+            if att is not None:
+                breaks = conn.execute('SELECT break_start, break_end FROM breaks WHERE attendance_id = ?', (st.session_state.attendance_id,)).fetchall()
+                shift = conn.execute("SELECT start_datetime, end_datetime FROM shifts WHERE user_id = ? AND work_date = ?", (st.session_state.user_id, today_str)).fetchone()
+        snapshot = {
+            'key': key,
+            'att': dict(att) if att else None,
+            'breaks': [dict(br) for br in breaks],
+            'shift': dict(shift) if shift else None,
+        }
+        st.session_state.timecard_snapshot = snapshot
+    return snapshot
+
+@st.fragment(run_every=1)
+def display_work_summary():
+    if st.session_state.get('attendance_id'):
+        today_str = get_jst_now().date().isoformat()
+        snapshot = get_timecard_snapshot()
+        att, breaks, shift = snapshot['att'], snapshot['breaks'], snapshot['shift']
+
+        if att is None:
+            invalidate_timecard_snapshot()
+            attendance_cache.invalidate(st.session_state.user_id)
+            st.toast("勤怠記録が見つかりませんでした。状態をリセットします。")
+            st.session_state.work_status = "not_started"
+            st.session_state.attendance_id = None
+            py_time.sleep(1)
+            st.rerun()
+            return
+
+        scheduled_end_time_str = "---"
+        scheduled_break_minutes = 0
+
+        if shift:
+            start_dt = datetime.fromisoformat(shift['start_datetime'])
+            end_dt = datetime.fromisoformat(shift['end_datetime'])
+            scheduled_end_time_str = end_dt.strftime('%H:%M')
+            shift_duration = end_dt - start_dt
+            scheduled_work_hours = shift_duration.total_seconds() / 3600
+
+            if scheduled_work_hours > 8:
+                scheduled_break_minutes = 60
+            elif scheduled_work_hours > 6:
+                scheduled_break_minutes = 45
+
+        st.divider()
+        row1_col1, row1_col2 = st.columns(2)
+        row2_col1, row2_col2 = st.columns(2)
+
+        with row1_col1:
+            st.metric("出勤時刻", datetime.fromisoformat(att['clock_in']).strftime('%H:%M:%S') if att['clock_in'] else "---")
+        with row1_col2:
+            if st.session_state.work_status == "finished":
+                actual_clock_out_time = datetime.fromisoformat(att['clock_out']).strftime('%H:%M:%S') if att['clock_out'] else "---"
+                st.metric("退勤時刻", actual_clock_out_time)
+            else:
+                st.metric("退勤予定時刻", scheduled_end_time_str)
+                
+        with row2_col1:
+            if st.session_state.work_status == "on_break" and scheduled_break_minutes > 0:
+                current_break_start_str = None
+                for br in breaks:
+                    if br['break_start'] and not br['break_end']:
+                        current_break_start_str = br['break_start']
+                        break
+                
+                if current_break_start_str:
+                    break_start_dt = datetime.fromisoformat(current_break_start_str)
+                    break_end_estimate_dt = break_start_dt + timedelta(minutes=scheduled_break_minutes)
+                    break_end_str = f"{break_end_estimate_dt.strftime('%H:%M')}頃に休憩終了"
+                    st.metric("休憩終了時刻", break_end_str)
+                else:
+                    st.metric("休憩予定", "---")
+            else:
+                scheduled_break_str = "---"
+                if shift and scheduled_break_minutes > 0:
+                    start_dt = datetime.fromisoformat(shift['start_datetime'])
+                    shift_duration = datetime.fromisoformat(shift['end_datetime']) - start_dt
+                    break_start_estimate_dt = start_dt + (shift_duration / 2) - timedelta(minutes=scheduled_break_minutes / 2)
+                    scheduled_break_start_time_str = break_start_estimate_dt.strftime('%H:%M')
+                    scheduled_break_str = f"{scheduled_break_start_time_str}頃に{scheduled_break_minutes}分"
+                st.metric("休憩予定", scheduled_break_str)
+
+        with row2_col2:
+            total_break_seconds = 0
+            for br in breaks:
+                if br['break_start'] and br['break_end']:
+                    total_break_seconds += (datetime.fromisoformat(br['break_end']) - datetime.fromisoformat(br['break_start'])).total_seconds()
+                elif br['break_start']:
+                    total_break_seconds += (get_jst_now() - datetime.fromisoformat(br['break_start'])).total_seconds()
+            break_hours, rem = divmod(total_break_seconds, 3600)
+            break_minutes, _ = divmod(rem, 60)
+            st.metric("現在の休憩時間", f"{int(break_hours):02}:{int(break_minutes):02}")
+
+        st.divider()
+        if att['clock_in']:
+            if att['clock_out']:
+                total_work_seconds = (datetime.fromisoformat(att['clock_out']) - datetime.fromisoformat(att['clock_in'])).total_seconds()
+            else:
+                total_work_seconds = (get_jst_now() - datetime.fromisoformat(att['clock_in'])).total_seconds()
+
+            net_work_seconds = total_work_seconds - total_break_seconds
+            work_hours, rem = divmod(net_work_seconds, 3600)
+            work_minutes, _ = divmod(rem, 60)
+            st.metric("総勤務時間", f"{int(work_hours):02}:{int(work_minutes):02}")
+        else:
+            st.metric("総勤務時間", "00:00")
+
+        st.divider()
+
+        if shift and scheduled_break_minutes > 0:
+            start_dt = datetime.fromisoformat(shift['start_datetime'])
+            shift_duration = datetime.fromisoformat(shift['end_datetime']) - start_dt
+            break_start_estimate_dt = start_dt + (shift_duration / 2) - timedelta(minutes=scheduled_break_minutes / 2)
+            reminder_time = break_start_estimate_dt - timedelta(minutes=10)
+            now = get_jst_now()
+            if st.session_state.last_break_reminder_date != today_str:
+                if now >= reminder_time.replace(tzinfo=JST) and now < break_start_estimate_dt.replace(tzinfo=JST):
+                    reminder_message = f"⏰ まもなく休憩の時間です。本日の勤務では、少なくとも{scheduled_break_minutes}分の休憩が必要です。"
+                    add_message(st.session_state.user_id, reminder_message)
+                    st.session_state.last_break_reminder_date = today_str
+                    st.toast("休憩10分前のお知らせをメッセージに送信しました。")
+
+        if shift and not att['clock_out']:
+            naive_end_dt = datetime.fromisoformat(shift['end_datetime'])
+            end_dt = naive_end_dt.replace(tzinfo=JST)
+            reminder_time = end_dt + timedelta(minutes=15)
+            now = get_jst_now()
+            if now > reminder_time and st.session_state.get('last_clock_out_reminder_date') != today_str:
+                log_content = f"⏰ {st.session_state.user_name}さん、退勤予定時刻を15分過ぎています。速やかに退勤してください。"
+                add_attendance_log(st.session_state.user_id, 'clock_out_reminder', log_content)
+                st.session_state.last_clock_out_reminder_date = today_str
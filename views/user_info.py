@@ -0,0 +1,164 @@
+import streamlit as st
+from datetime import datetime
+import time as py_time
+import sqlite3
+from database import db_connection
+import deletion
+from common import add_message, delete_user, hash_password, validate_password
+
+def update_user_password(user_id, new_password):
+    new_hashed_password = hash_password(new_password)
+    try:
+        with db_connection() as conn:
+            conn.execute('UPDATE users SET password_hash = ? WHERE id = ?', (new_hashed_password, user_id))
+        return True
+    except sqlite3.Error as e:
+        st.error(f"データベースエラー: {e}")
+        return False
+
+# 会社の全データ削除はバックグラウンドのジョブで行い、進み具合をこのフラグメントで毎秒表示する
+@st.fragment(run_every=1)
+def render_company_deletion_progress(job_id):
+    job = deletion.get_job(job_id)
+    if job is None or job['status'] == 'done':
+        st.success("会社の全データを削除しました。ログアウトします。")
+        py_time.sleep(2)
+        for key in list(st.session_state.keys()): del st.session_state[key]
+        st.rerun()
+    elif deletion.retries_exhausted(job):
+        st.error(f"削除中にエラーが発生し、{job['attempts']}回続けて失敗したため自動での再開を停止しました。管理者に連絡してください。\n\n{job['error']}")
+    elif job['status'] == 'failed':
+        st.error(f"削除中にエラーが発生しました。次回の起動時に続きから再開されます。\n\n{job['error']}")
+    else:
+        progress, step_label = deletion.step_progress(job)
+        st.progress(progress, text=f"{step_label}を削除しています…（{job['deleted_rows']}件削除済み）")
+
+def show_user_info_page():
+    st.header("ユーザー情報")
+    if st.session_state.deletion_job_id:
+        render_company_deletion_progress(st.session_state.deletion_job_id)
+        return
+
+    with db_connection() as conn:
+        user_data = conn.execute('SELECT id, name, employee_id, created_at, password_hash, company, position FROM users WHERE id = ?', (st.session_state.user_id,)).fetchone()
+
+    if user_data:
+        st.text_input("名前", value=user_data['name'], disabled=True)
+        st.text_input("会社名", value=user_data['company'] or '未登録', disabled=True)
+        st.text_input("役職", value=user_data['position'] or '未登録', disabled=True)
+        st.text_input("従業員ID", value=user_data['employee_id'], disabled=True)
+        st.text_input("登録日時", value=datetime.fromisoformat(user_data['created_at']).strftime('%Y年%m月%d日 %H:%M:%S'), disabled=True)
+        st.divider()
+        st.subheader("パスワードの変更")
+        with st.form("password_change_form"):
+            current_password = st.text_input("現在のパスワード", type="password")
+            new_password = st.text_input("新しいパスワード", type="password")
+            confirm_new_password = st.text_input("新しいパスワード（確認用）", type="password")
+            submitted = st.form_submit_button("パスワードを変更")
+            if submitted:
+                if not all([current_password, new_password, confirm_new_password]):
+                    st.error("すべてのパスワード欄を入力してください。")
+                elif user_data['password_hash'] != hash_password(current_password):
+                    st.error("現在のパスワードが正しくありません。")
+                elif new_password != confirm_new_password:
+                    st.error("新しいパスワードが一致しません。")
+                else:
+                    password_errors = validate_password(new_password)
+                    if password_errors:
+                        st.error("新しいパスワードは以下の要件を満たす必要があります：\n" + "\n".join(password_errors))
+                    else:
+                        if update_user_password(st.session_state.user_id, new_password):
+                            st.success("パスワードが正常に変更されました。")
+                            add_message(st.session_state.user_id, "🔒 パスワードが変更されました。")
+
+        if st.session_state.user_position == "社長":
+            st.divider()
+            st.subheader("管理者用 危険な操作")
+
+            if st.session_state.confirm_delete_self_step == 0:
+                if st.button("自身の情報を削除", use_container_width=True, type="primary"):
+                    st.session_state.confirm_delete_self_step = 1
+                    st.rerun()
+            
+            if st.session_state.confirm_delete_self_step == 1:
+                st.warning("【ステップ1/3】本当にあなた自身のアカウントを削除しますか？この操作は元に戻せません。")
+                c1, c2 = st.columns(2)
+                if c1.button("はい、削除に進みます", key="self_del_step1", use_container_width=True):
+                    st.session_state.confirm_delete_self_step = 2
+                    st.rerun()
+                if c2.button("戻る", key="self_del_back1", use_container_width=True):
+                    st.session_state.confirm_delete_self_step = 0
+                    st.rerun()
+
+            if st.session_state.confirm_delete_self_step == 2:
+                st.warning("【ステップ2/3】最終確認です。あなたのアカウントと関連する全てのデータ（勤怠、シフト等）が完全に削除されます。")
+                c1, c2 = st.columns(2)
+                if c1.button("はい、理解した上で削除に進みます", key="self_del_step2", use_container_width=True):
+                    st.session_state.confirm_delete_self_step = 3
+                    st.rerun()
+                if c2.button("戻る", key="self_del_back2", use_container_width=True):
+                    st.session_state.confirm_delete_self_step = 0
+                    st.rerun()
+
+            if st.session_state.confirm_delete_self_step == 3:
+                st.warning("【ステップ3/3】パスワードを入力して、アカウント削除を最終実行してください。")
+                with st.form("self_delete_form"):
+                    password = st.text_input("パスワード", type="password")
+                    c1, c2 = st.columns(2)
+                    submitted = c1.form_submit_button("アカウントを完全に削除する", type="primary", use_container_width=True)
+                    cancelled = c2.form_submit_button("戻る", use_container_width=True)
+                    if submitted:
+                        if user_data['password_hash'] == hash_password(password):
+                            if delete_user(st.session_state.user_id):
+                                st.success("アカウントを削除しました。ログアウトします。")
+                                py_time.sleep(2)
+                                for key in list(st.session_state.keys()): del st.session_state[key]
+                                st.rerun()
+                        else:
+                            st.error("パスワードが正しくありません。")
+                    if cancelled:
+                        st.session_state.confirm_delete_self_step = 0
+                        st.rerun()
+
+            if st.session_state.confirm_delete_company_step == 0:
+                if st.button("会社の全データを削除", use_container_width=True, type="primary"):
+                    st.session_state.confirm_delete_company_step = 1
+                    st.rerun()
+
+            if st.session_state.confirm_delete_company_step == 1:
+                st.warning(f"【ステップ1/3】本当に会社「{user_data['company']}」の全データを削除しますか？あなたを含む全従業員のアカウント、全ての勤怠・シフト・メッセージ履歴が削除されます。")
+                c1, c2 = st.columns(2)
+                if c1.button("はい、全削除に進みます", key="comp_del_step1", use_container_width=True):
+                    st.session_state.confirm_delete_company_step = 2
+                    st.rerun()
+                if c2.button("戻る", key="comp_del_back1", use_container_width=True):
+                    st.session_state.confirm_delete_company_step = 0
+                    st.rerun()
+            
+            if st.session_state.confirm_delete_company_step == 2:
+                st.warning("【ステップ2/3】最終警告です。この操作は絶対に元に戻すことはできません。会社の全データが失われることを本当に理解していますか？")
+                c1, c2 = st.columns(2)
+                if c1.button("はい、全てのデータが失われることを理解した上で削除に進みます", key="comp_del_step2", use_container_width=True):
+                    st.session_state.confirm_delete_company_step = 3
+                    st.rerun()
+                if c2.button("戻る", key="comp_del_back2", use_container_width=True):
+                    st.session_state.confirm_delete_company_step = 0
+                    st.rerun()
+
+            if st.session_state.confirm_delete_company_step == 3:
+                st.warning("【ステップ3/3】パスワードを入力して、会社の全データ削除を最終実行してください。")
+                with st.form("company_delete_form"):
+                    password = st.text_input("パスワード", type="password")
+                    c1, c2 = st.columns(2)
+                    submitted = c1.form_submit_button("会社の全データを完全に削除する", type="primary", use_container_width=True)
+                    cancelled = c2.form_submit_button("戻る", use_container_width=True)
+                    if submitted:
+                        if user_data['password_hash'] == hash_password(password):
+                            st.session_state.deletion_job_id = deletion.start_job('company', user_data['company'])
+                            st.session_state.confirm_delete_company_step = 0
+                            st.rerun()
+                        else:
+                            st.error("パスワードが正しくありません。")
+                    if cancelled:
+                        st.session_state.confirm_delete_company_step = 0
+                        st.rerun()
@@ -0,0 +1,164 @@
+import streamlit as st
+import pandas as pd
+import altair as alt
+from datetime import datetime, date, timedelta
+from dateutil.relativedelta import relativedelta
+import io
+import os
+from database import db_connection
+import payroll_export
+
+def get_daily_work_totals(user_id, start_date, end_date):
+    # 1日ごとの実働・休憩・残業秒数。打刻時に更新される日次集計（daily_work_summary）を範囲で読むだけにする
+    with db_connection() as conn:
+        rows = conn.execute("SELECT work_date, net_seconds, break_seconds, overtime_seconds FROM daily_work_summary WHERE user_id = ? AND work_date BETWEEN ? AND ?",
+                            (user_id, start_date.isoformat(), end_date.isoformat())).fetchall()
+    return {
+        date.fromisoformat(row['work_date']): {
+            'work_seconds': row['net_seconds'],
+            'break_seconds': row['break_seconds'],
+            'overtime_seconds': row['overtime_seconds'],
+        }
+        for row in rows
+    }
+
+def get_work_hours_data(start_date, end_date):
+    work_data = {}
+    current_date = start_date
+    while current_date <= end_date:
+        work_data[current_date] = 0
+        current_date += timedelta(days=1)
+
+    for work_date, daily in get_daily_work_totals(st.session_state.user_id, start_date, end_date).items():
+        actual_work_minutes = round(daily['work_seconds'] / 60)
+        if actual_work_minutes > 0:
+            work_data[work_date] = actual_work_minutes
+    return work_data
+
+# 実働時間グラフ。既定は Altair（Vega-Lite の仕様だけを送り、描画はブラウザで行う）。
+# ATTENDANCE_CHART_BACKEND=matplotlib の場合はサーバー側でPNGを描画し、集計値をキーにキャッシュする。
+WORK_CHART_BACKEND = os.environ.get('ATTENDANCE_CHART_BACKEND', 'altair')
+WORK_CHART_PERIODS = ("当週", "当月", "当年")
+WEEKDAY_JP = ["月", "火", "水", "木", "金", "土", "日"]
+
+def get_work_chart_data(period, today):
+    if period == "当週":
+        start_of_week = today - timedelta(days=(today.weekday() + 1) % 7)
+        weekly_data = get_work_hours_data(start_of_week, start_of_week + timedelta(days=6))
+        return [f"{d.day}日({WEEKDAY_JP[d.weekday()]})" for d in weekly_data], list(weekly_data.values())
+    if period == "当月":
+        start_of_month = today.replace(day=1)
+        monthly_data = get_work_hours_data(start_of_month, (start_of_month + relativedelta(months=1)) - timedelta(days=1))
+        return [f"{d.day}日" for d in monthly_data], list(monthly_data.values())
+
+    yearly_data = get_work_hours_data(today.replace(month=1, day=1), today.replace(month=12, day=31))
+    monthly_totals = {m: 0 for m in range(1, 13)}
+    for day, minutes in yearly_data.items():
+        monthly_totals[day.month] += minutes
+    return [f"{m}月" for m in monthly_totals], list(monthly_totals.values())
+
+def work_chart_tick_interval(max_val):
+    if max_val < 60: return 5
+    elif max_val < 600: return 60
+    elif max_val < 6000: return 300
+    else: return 1500
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def render_work_hours_png(labels, values):
+    # matplotlib は読み込みが重いため、PNG描画を使う設定の時だけ初回に読み込む
+    import japanize_matplotlib
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    try:
+        ax.bar(labels, values)
+        ax.set_ylabel('実働時間 (分)')
+        ax.tick_params(axis='x', rotation=90)
+        ax.yaxis.set_major_locator(plt.MultipleLocator(work_chart_tick_interval(max(values))))
+        fig.tight_layout()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png')
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+def build_work_hours_chart(labels, values):
+    interval = work_chart_tick_interval(max(values))
+    return alt.Chart(pd.DataFrame({'label': labels, 'minutes': values})).mark_bar().encode(
+        x=alt.X('label:N', sort=None, title=None, axis=alt.Axis(labelAngle=-90)),
+        y=alt.Y('minutes:Q', title='実働時間 (分)', axis=alt.Axis(values=list(range(0, max(values) + interval, interval)))),
+        tooltip=[alt.Tooltip('label:N', title='期間'), alt.Tooltip('minutes:Q', title='実働時間 (分)')],
+    )
+
+def render_work_hours_chart(labels, values):
+    if WORK_CHART_BACKEND == 'matplotlib':
+        st.image(render_work_hours_png(tuple(labels), tuple(values)), use_container_width=True)
+    else:
+        st.altair_chart(build_work_hours_chart(labels, values), use_container_width=True)
+
+PAYROLL_EXPORT_FORMATS = {"CSV": ('csv', 'text/csv'), "Excel": ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')}
+
+def render_payroll_export(first_day, last_day):
+    with st.expander("📤 給与計算用の勤怠データを出力"):
+        st.caption(f"{first_day.strftime('%Y年%m月')}の全従業員の勤怠を、1日1行（出勤・退勤・休憩・実働・残業・深夜）で出力します。")
+        format_label = st.radio("形式", list(PAYROLL_EXPORT_FORMATS), horizontal=True, key="payroll_export_format")
+        if st.button("出力ファイルを作成"):
+            file_format, mime = PAYROLL_EXPORT_FORMATS[format_label]
+            with st.spinner("作成しています..."):
+                data = payroll_export.build_payroll_file(file_format, st.session_state.user_company, first_day, last_day)
+            st.download_button("ダウンロード", data, file_name=f"勤怠_{first_day.strftime('%Y%m')}.{file_format}", mime=mime, type="primary")
+
+def show_work_status_page():
+    st.header("出勤状況")
+
+    col1, col2, col3 = st.columns([1, 6, 1])
+    with col1:
+        if st.button("先月", key="status_prev"):
+            st.session_state.calendar_date -= relativedelta(months=1)
+            st.rerun()
+    with col2:
+        st.subheader(st.session_state.calendar_date.strftime('%Y年 %m月'), anchor=False, divider='blue')
+    with col3:
+        if st.button("来月", key="status_next"):
+            st.session_state.calendar_date += relativedelta(months=1)
+            st.rerun()
+
+    selected_month = st.session_state.calendar_date
+    first_day_month = selected_month.replace(day=1)
+    last_day_month = (first_day_month + relativedelta(months=1)) - timedelta(days=1)
+
+    with db_connection() as conn:
+        shifts_records = conn.execute("SELECT work_date, start_datetime, end_datetime FROM shifts WHERE user_id = ? AND work_date BETWEEN ? AND ?", (st.session_state.user_id, first_day_month.isoformat(), last_day_month.isoformat())).fetchall()
+        shifts_dict = {row['work_date']: dict(row) for row in shifts_records}
+        total_scheduled_seconds = 0
+        for shift in shifts_dict.values():
+            total_scheduled_seconds += (datetime.fromisoformat(shift['end_datetime']) - datetime.fromisoformat(shift['start_datetime'])).total_seconds()
+
+    daily_totals = get_daily_work_totals(st.session_state.user_id, first_day_month, last_day_month).values()
+    total_actual_work_seconds = sum(d['work_seconds'] for d in daily_totals)
+    total_break_seconds = sum(d['break_seconds'] for d in daily_totals)
+    total_overtime_seconds = sum(d['overtime_seconds'] for d in daily_totals)
+
+    def format_seconds_to_hours_minutes(seconds):
+        hours, remainder = divmod(int(seconds), 3600)
+        minutes, _ = divmod(remainder, 60)
+        return f"{hours}時間 {minutes:02}分"
+
+    m_col1, m_col2, m_col3, m_col4 = st.columns(4)
+    m_col1.metric("出勤予定時間", format_seconds_to_hours_minutes(total_scheduled_seconds))
+    m_col2.metric("実働時間", format_seconds_to_hours_minutes(total_actual_work_seconds))
+    m_col3.metric("合計休憩時間", format_seconds_to_hours_minutes(total_break_seconds))
+    m_col4.metric("時間外労働時間", format_seconds_to_hours_minutes(total_overtime_seconds))
+
+    if st.session_state.user_position in ["社長", "役職者"]:
+        render_payroll_export(first_day_month, last_day_month)
+    st.divider()
+
+    st.subheader("📊 実働時間グラフ")
+    # 選択中の期間だけを集計・描画する（st.tabs だと見えないタブのグラフも毎回作られる）
+    period = st.radio("表示期間", WORK_CHART_PERIODS, horizontal=True, key="work_chart_period", label_visibility="collapsed")
+    labels, values = get_work_chart_data(period, date.today())
+    if any(v > 0 for v in values):
+        render_work_hours_chart(labels, values)
+    else:
+        st.info("この期間のデータはありません。")
@@ -0,0 +1,90 @@
+from datetime import datetime, time, timedelta, timezone
+
+# 勤怠の日次集計（daily_work_summary）を保持する。打刻や休憩の確定時に該当日の1行だけを再計算し、
+# 週・月・年の表示は集計済みの行を範囲で合計するだけにする。秒数はすべて実数で持つ。
+JST = timezone(timedelta(hours=9), 'JST')
+NIGHT_START = time(22, 0)
+NIGHT_END = time(5, 0)
+REBUILD_BATCH_SIZE = 500
+
+def _night_seconds(start, end):
+    # 深夜帯（22:00〜翌5:00 JST）と重なる秒数
+    start, end = start.astimezone(JST), end.astimezone(JST)
+    total = 0.0
+    day = start.date() - timedelta(days=1)
+    while day <= end.date():
+        night_start = datetime.combine(day, NIGHT_START, JST)
+        night_end = datetime.combine(day + timedelta(days=1), NIGHT_END, JST)
+        overlap = (min(end, night_end) - max(start, night_start)).total_seconds()
+        if overlap > 0:
+            total += overlap
+        day += timedelta(days=1)
+    return total
+
+def _summarize(att, breaks, shift_end_epoch):
+    clock_in, clock_out = datetime.fromisoformat(att['clock_in']), datetime.fromisoformat(att['clock_out'])
+    gross_seconds = (clock_out - clock_in).total_seconds()
+    break_seconds = 0.0
+    night_seconds = _night_seconds(clock_in, clock_out)
+    for br in breaks:
+        if br['break_start'] and br['break_end']:
+            break_start, break_end = datetime.fromisoformat(br['break_start']), datetime.fromisoformat(br['break_end'])
+            break_seconds += (break_end - break_start).total_seconds()
+            night_seconds -= _night_seconds(break_start, break_end)
+    overtime_seconds = 0.0
+    if shift_end_epoch is not None:
+        overtime_seconds = max(0.0, clock_out.timestamp() - shift_end_epoch)
+    return (gross_seconds, gross_seconds - break_seconds, break_seconds, overtime_seconds, max(0.0, night_seconds))
+
+def _upsert(conn, user_id, work_date, values):
+    conn.execute('''
+        INSERT INTO daily_work_summary (user_id, work_date, gross_seconds, net_seconds, break_seconds, overtime_seconds, night_seconds)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (user_id, work_date) DO UPDATE SET
+            gross_seconds = excluded.gross_seconds, net_seconds = excluded.net_seconds,
+            break_seconds = excluded.break_seconds, overtime_seconds = excluded.overtime_seconds,
+            night_seconds = excluded.night_seconds
+    ''', (user_id, work_date) + values)
+
+def _shift_end_epoch(conn, user_id, work_date):
+    shift = conn.execute('SELECT end_epoch FROM shifts WHERE user_id = ? AND work_date = ? ORDER BY id DESC LIMIT 1', (user_id, work_date)).fetchone()
+    return shift['end_epoch'] if shift else None
+
+def refresh_day(conn, user_id, work_date):
+    # 呼び出し元の書き込みと同じトランザクション内で呼ぶこと。退勤前・取り消し済みの日は行を削除する。
+    att = conn.execute('SELECT id, clock_in, clock_out FROM attendance WHERE user_id = ? AND work_date = ?', (user_id, work_date)).fetchone()
+    if att is None or not att['clock_in'] or not att['clock_out']:
+        conn.execute('DELETE FROM daily_work_summary WHERE user_id = ? AND work_date = ?', (user_id, work_date))
+        return
+    breaks = conn.execute('SELECT break_start, break_end FROM breaks WHERE attendance_id = ?', (att['id'],)).fetchall()
+    _upsert(conn, user_id, work_date, _summarize(att, breaks, _shift_end_epoch(conn, user_id, work_date)))
+
+def refresh_attendance(conn, attendance_id):
+    att = conn.execute('SELECT user_id, work_date FROM attendance WHERE id = ?', (attendance_id,)).fetchone()
+    if att is not None:
+        refresh_day(conn, att['user_id'], att['work_date'])
+
+def rebuild(conn):
+    # 既存データからの作り直し（バックフィル）。勤怠をID順に一定件数ずつ読み、休憩とシフトはまとめて取得する。
+    conn.execute('DELETE FROM daily_work_summary')
+    last_id, rows = 0, 0
+    while True:
+        attendances = conn.execute('''
+            SELECT id, user_id, work_date, clock_in, clock_out FROM attendance
+            WHERE id > ? AND clock_in IS NOT NULL AND clock_out IS NOT NULL
+            ORDER BY id LIMIT ?
+        ''', (last_id, REBUILD_BATCH_SIZE)).fetchall()
+        if not attendances:
+            return rows
+        last_id = attendances[-1]['id']
+
+        placeholders = ','.join('?' for _ in attendances)
+        breaks_by_attendance = {}
+        for br in conn.execute(f'SELECT attendance_id, break_start, break_end FROM breaks WHERE attendance_id IN ({placeholders})',
+                               [att['id'] for att in attendances]):
+            breaks_by_attendance.setdefault(br['attendance_id'], []).append(br)
+
+        for att in attendances:
+            shift_end_epoch = _shift_end_epoch(conn, att['user_id'], att['work_date'])
+            _upsert(conn, att['user_id'], att['work_date'], _summarize(att, breaks_by_attendance.get(att['id'], []), shift_end_epoch))
+        rows += len(attendances)